@@ -1,2 +1,30 @@
 from .dimacs import read
-from .dimacs import Dimacs
\ No newline at end of file
+from .dimacs import iter_clauses
+from .dimacs import read_header
+from .dimacs import validate
+from .dimacs import Dimacs
+from .dimacs import DimacsHeader
+from .dimacs import DimacsStats
+from .dimacswriter import write
+from .dimacswriter import DimacsWriter
+from .dimacscache import DimacsCache
+from .modelreconstructor import ModelReconstructor
+from .preprocessor import preprocess
+from .preprocessor import Preprocessor
+from .subsumer import subsume
+from .subsumer import Subsumer
+from .eliminator import eliminate_variables
+from .eliminator import VariableEliminator
+from .occurrenceindex import OccurrenceIndex
+from .components import split_components
+from .components import merge_models
+from .dimacs import read_wcnf
+from .dimacs import Wcnf
+from .dimacswriter import write_wcnf
+from .dimacs import read_qdimacs
+from .dimacs import Qdimacs
+from .dimacs import iter_icnf
+from .portfolio import solve_portfolio
+from .portfolio import PortfolioResult
+from .generator import iter_random_ksat
+from .generator import write_random_ksat
@@ -0,0 +1,174 @@
+""" Throughput benchmarks for the DIMACS parser. Run with
+
+      python -m mxklabs.dimacs.benchmarks --output results.json
+
+    to generate inputs of several shapes and sizes, parse each of them in every
+    reading mode and save the results as JSON. Passing --baseline with an
+    earlier results file prints the change in throughput per benchmark. """
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from .dimacs import read, iter_clauses, validate
+from .dimacswriter import format_clauses
+from .generator import iter_random_ksat
+
+# Default input sizes, in number of clauses of a random 3-SAT formula.
+DEFAULT_SIZES = (10**4, 10**5, 10**6)
+
+def _write_random(file, num_clauses, num_vars, k, line_end=b"\n", comment_every=None):
+  """ Write a random k-SAT formula, optionally with CRLF line endings or a
+      comment line after every comment_every clauses. """
+  file.write(b"p cnf %d %d%s" % (num_vars, num_clauses, line_end))
+  for literals, offsets in iter_random_ksat(num_vars, num_clauses=num_clauses, k=k, block_size=1 << 16):
+    if comment_every is None:
+      text = format_clauses(literals, offsets)
+    else:
+      lines = []
+      for start in range(0, len(offsets) - 1, comment_every):
+        end = min(start + comment_every, len(offsets) - 1)
+        lines.append(format_clauses(literals[offsets[start]:offsets[end]], offsets[start:end + 1]))
+        lines.append(b"c clauses %d to %d of this block\n" % (start, end - 1))
+      text = b"".join(lines)
+    file.write(text if line_end == b"\n" else text.replace(b"\n", line_end))
+
+# Input shapes: a name and a function writing a formula with about the given
+# number of literals (three per clause) to a binary file.
+SHAPES = {
+  "random_3sat": lambda file, size: _write_random(file, size, max(3, size // 4), 3),
+  "long_clauses": lambda file, size: _write_random(file, max(1, size // 100), 10**6, 300),
+  "many_comments": lambda file, size: _write_random(file, size, max(3, size // 4), 3, comment_every=2),
+  "crlf": lambda file, size: _write_random(file, size, max(3, size // 4), 3, line_end=b"\r\n"),
+  "wide_variables": lambda file, size: _write_random(file, size, 2**31 - 1, 3),
+}
+
+def _count_clauses(clauses):
+  return sum(1 for _ in clauses)
+
+# Reading modes: a name and a function parsing a file, returning the number of
+# clauses. The cached mode is timed on reads that hit the cache.
+MODES = {
+  "text": lambda filename, cache_dir: read(filename=filename).num_clauses,
+  "mmap": lambda filename, cache_dir: read(filename=filename, use_mmap=True).num_clauses,
+  "parallel": lambda filename, cache_dir: read(filename=filename, workers=2).num_clauses,
+  "gzip": lambda filename, cache_dir: read(filename=filename + ".gz").num_clauses,
+  "cached": lambda filename, cache_dir: read(filename=filename, cache_dir=cache_dir).num_clauses,
+  "lazy": lambda filename, cache_dir: _count_clauses(iter_clauses(filename=filename, use_mmap=True)),
+  "validate": lambda filename, cache_dir: validate(filename=filename, use_mmap=True).num_clauses,
+}
+
+def measure(function, repeat=3):
+  """ Call function repeat times and return the smallest wall-clock time, the
+      result of the last call and the peak memory traced (by tracemalloc) during
+      an additional call. Memory allocated in worker processes is not traced. """
+  seconds = None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    seconds = elapsed if seconds is None else min(seconds, elapsed)
+  tracemalloc.start()
+  try:
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return seconds, result, peak
+
+def run(sizes=DEFAULT_SIZES, shapes=None, modes=None, repeat=3, directory=None, log=None):
+  """ Run the benchmarks and return the results as a dict that can be saved
+      as JSON. For every shape and size an input file is generated in
+      directory (a temporary directory by default) and parsed in every mode. """
+  shapes = list(SHAPES) if shapes is None else shapes
+  modes = list(MODES) if modes is None else modes
+  results = []
+  with tempfile.TemporaryDirectory(dir=directory) as work_dir:
+    cache_dir = os.path.join(work_dir, "cache")
+    for shape in shapes:
+      for size in sizes:
+        filename = os.path.join(work_dir, "%s_%d.cnf" % (shape, size))
+        with open(filename, "wb") as file:
+          SHAPES[shape](file, size)
+        with open(filename, "rb") as source, gzip.open(filename + ".gz", "wb", compresslevel=1) as target:
+          target.write(source.read())
+        # Fill the cache so the cached mode measures cache hits.
+        read(filename=filename, cache_dir=cache_dir)
+        size_bytes = os.path.getsize(filename)
+        for mode in modes:
+          seconds, num_clauses, peak = measure(lambda: MODES[mode](filename, cache_dir), repeat=repeat)
+          result = {
+            "shape": shape,
+            "size": size,
+            "mode": mode,
+            "bytes": size_bytes,
+            "clauses": num_clauses,
+            "seconds": seconds,
+            "mb_per_s": size_bytes / seconds / 1e6,
+            "clauses_per_s": num_clauses / seconds,
+            "peak_memory_bytes": peak,
+          }
+          results.append(result)
+          if log is not None:
+            log(format_result(result))
+        os.remove(filename)
+        os.remove(filename + ".gz")
+  return {
+    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    "python": platform.python_version(),
+    "numpy": np.__version__,
+    "platform": platform.platform(),
+    "cpus": os.cpu_count(),
+    "repeat": repeat,
+    "results": results,
+  }
+
+def format_result(result):
+  return "%-15s %9d %-9s %8.1f MB/s %12.0f clauses/s %9.1f MB peak" % (result["shape"], result["size"],
+    result["mode"], result["mb_per_s"], result["clauses_per_s"], result["peak_memory_bytes"] / 1e6)
+
+def compare(results, baseline):
+  """ Return (shape, size, mode, ratio) for every benchmark in both result
+      dicts, where ratio is the throughput relative to the baseline (below 1
+      means slower). """
+  baseline_results = {(r["shape"], r["size"], r["mode"]): r for r in baseline["results"]}
+  comparison = []
+  for result in results["results"]:
+    key = (result["shape"], result["size"], result["mode"])
+    if key in baseline_results:
+      comparison.append(key + (result["mb_per_s"] / baseline_results[key]["mb_per_s"],))
+  return comparison
+
+def main(args=None):
+  parser = argparse.ArgumentParser(description="Benchmark the mxklabs.dimacs parser.")
+  parser.add_argument("--output", help="file to save the results to as JSON")
+  parser.add_argument("--baseline", help="earlier results file to compare against")
+  parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+    help="input sizes in number of clauses")
+  parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), help="input shapes (default: all)")
+  parser.add_argument("--modes", nargs="+", choices=list(MODES), help="reading modes (default: all)")
+  parser.add_argument("--repeat", type=int, default=3, help="number of timed runs per benchmark")
+  parser.add_argument("--directory", help="directory for the generated inputs")
+  args = parser.parse_args(args)
+
+  results = run(sizes=args.sizes, shapes=args.shapes, modes=args.modes, repeat=args.repeat,
+    directory=args.directory, log=print)
+  if args.output is not None:
+    with open(args.output, "w") as file:
+      json.dump(results, file, indent=2)
+  if args.baseline is not None:
+    with open(args.baseline) as file:
+      baseline = json.load(file)
+    for shape, size, mode, ratio in compare(results, baseline):
+      print("%-15s %9d %-9s %6.2fx%s" % (shape, size, mode, ratio, "  slower" if ratio < 0.9 else ""))
+  return results
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,92 @@
+import numpy as np
+
+from .dimacs import Dimacs
+from .dimacsutils import DimacsUtils
+
+def get_component_labels(dimacs):
+  """ Label every variable with the smallest variable in its connected
+      component, where variables are connected if they occur in the same
+      clause. Returns an array indexed by variable. This is a vectorized
+      union-find: each round hooks the root of every edge's larger endpoint to
+      the smaller root and then compresses paths by pointer jumping. """
+  variables = np.abs(dimacs.literals).astype(np.int64)
+  clause_ids = DimacsUtils.get_clause_ids(dimacs.offsets)
+  # Connecting consecutive literals of each clause is enough.
+  is_edge = clause_ids[1:] == clause_ids[:-1]
+  sources, targets = variables[:-1][is_edge], variables[1:][is_edge]
+  labels = np.arange(dimacs.num_vars + 1, dtype=np.int64)
+  while True:
+    source_labels, target_labels = labels[sources], labels[targets]
+    is_split = source_labels != target_labels
+    if not np.any(is_split):
+      return labels
+    source_labels, target_labels = source_labels[is_split], target_labels[is_split]
+    np.minimum.at(labels, np.maximum(source_labels, target_labels), np.minimum(source_labels, target_labels))
+    while True:
+      next_labels = labels[labels]
+      if np.array_equal(next_labels, labels):
+        break
+      labels = next_labels
+
+def split_components(dimacs):
+  """ Split a mxklabs.dimacs.Dimacs object into variable-disjoint components.
+      Returns a list of (Dimacs, inverse_map) pairs, ordered by the smallest
+      variable in each component. Each component's variables are renumbered
+      to 1..n and inverse_map[v] is the original number of variable v (see
+      Dimacs.compact). Empty clauses, if any, form a component of their own,
+      which comes first. """
+  labels = get_component_labels(dimacs)
+  variables = np.abs(dimacs.literals).astype(np.int64)
+  lengths = dimacs.clause_lengths()
+
+  # Group the used variables by component and number them within it.
+  is_used = np.zeros(dimacs.num_vars + 1, dtype=bool)
+  is_used[variables] = True
+  is_used[0] = False
+  used_variables = np.flatnonzero(is_used)
+  variable_order = np.argsort(labels[used_variables], kind='stable')
+  grouped_variables = used_variables[variable_order]
+  variable_offsets = np.concatenate(([0], np.flatnonzero(np.diff(labels[grouped_variables])) + 1, [len(grouped_variables)]))
+  ranks = np.zeros(dimacs.num_vars + 1, dtype=np.int32)
+  ranks[grouped_variables] = np.arange(len(grouped_variables)) - \
+    np.repeat(variable_offsets[:-1], np.diff(variable_offsets)) + 1
+
+  # Group the clauses by component and renumber their literals.
+  clause_labels = np.full(dimacs.num_clauses, -1, dtype=np.int64)
+  is_empty = lengths == 0
+  clause_labels[~is_empty] = labels[variables[dimacs.offsets[:-1][~is_empty]]]
+  clause_order = np.argsort(clause_labels, kind='stable')
+  grouped_lengths = lengths[clause_order]
+  literal_offsets = DimacsUtils.make_offsets(grouped_lengths)
+  positions = np.arange(literal_offsets[-1]) - np.repeat(literal_offsets[:-1], grouped_lengths) + \
+    np.repeat(dimacs.offsets[clause_order], grouped_lengths)
+  literals = ranks[variables[positions]]
+  np.negative(literals, out=literals, where=dimacs.literals[positions] < 0)
+  grouped_labels = clause_labels[clause_order]
+  clause_offsets = np.concatenate(([0], np.flatnonzero(np.diff(grouped_labels)) + 1, [dimacs.num_clauses]))
+
+  components = []
+  num_empty = int(np.count_nonzero(is_empty))
+  if num_empty > 0:
+    components.append((Dimacs(literals=literals[:0], offsets=np.zeros(num_empty + 1, dtype=np.int64)),
+      np.zeros(1, dtype=np.int32)))
+    clause_offsets = clause_offsets[1:]
+  if dimacs.num_clauses == num_empty:
+    return components
+  for component in range(len(clause_offsets) - 1):
+    start, end = clause_offsets[component], clause_offsets[component + 1]
+    offsets = literal_offsets[start:end + 1]
+    variable_start, variable_end = variable_offsets[component], variable_offsets[component + 1]
+    inverse_map = np.concatenate(([0], grouped_variables[variable_start:variable_end])).astype(np.int32)
+    components.append((Dimacs(literals=literals[offsets[0]:offsets[-1]], offsets=offsets - offsets[0],
+      num_vars=int(variable_end - variable_start)), inverse_map))
+  return components
+
+def merge_models(models, inverse_maps, num_vars):
+  """ Combine models of the components returned by split_components (boolean
+      arrays indexed by variable, or lists of signed literals) into a boolean
+      array of length num_vars+1 indexed by original variable. """
+  assignment = np.zeros(num_vars + 1, dtype=bool)
+  for model, inverse_map in zip(models, inverse_maps):
+    assignment[inverse_map[1:]] = DimacsUtils.get_assignment(model, len(inverse_map) - 1)[1:]
+  return assignment
@@ -1,75 +1,512 @@
+import array
+import bz2
+import concurrent.futures
+import gzip
+import hashlib
+import itertools
+import lzma
+import mmap
+import os
+import re
 import sys
 import string
 import unittest
 
+import numpy as np
+
+from .dimacscache import DimacsCache
+from .dimacsutils import DimacsUtils
+from .occurrenceindex import OccurrenceIndex
+
+# Literals are stored as 32-bit signed integers.
+MAX_VAR = 2**31 - 1
+
+# Classification of the bytes that may appear in a clause section.
+_OTHER, _SPACE, _DIGIT, _MINUS = range(4)
+_BYTE_CLASSES = np.full(256, _OTHER, dtype=np.uint8)
+_BYTE_CLASSES[[ord(c) for c in string.whitespace]] = _SPACE
+_BYTE_CLASSES[[ord(c) for c in string.digits]] = _DIGIT
+_BYTE_CLASSES[ord('-')] = _MINUS
+_ZERO_BYTE = ord('0')
+_NEWLINE_BYTE = ord('\n')
+_COMMENT_BYTE = ord('c')
+_HARD_BYTE = ord('h')
+_ASSUMPTION_BYTE = ord('a')
+
+# Weights of WCNF clauses are stored as 64-bit signed integers. Until the top
+# weight is known, hard clauses are given this weight.
+MAX_WEIGHT = 2**63 - 1
+_HARD_WEIGHT = -1
+
+# Compressed file formats, recognised by their magic bytes.
+_COMPRESSION_FORMATS = [
+  (b'\x1f\x8b', gzip.open),
+  (b'BZh', bz2.open),
+  (b'\xfd7zXZ\x00', lzma.open)
+]
+
+# A '0' ending a line, i.e. a point where the clause section can be split.
+_CLAUSE_BOUNDARY = re.compile(rb'(?:^|[ \t])0[ \t\r]*\n', re.MULTILINE)
+
+# An assumption line in the clause section of iCNF input.
+_ASSUMPTION_LINE = re.compile(r'^a(?:[ \t][^\n]*)?$', re.MULTILINE)
+_ASSUMPTION_LINE_BYTES = re.compile(rb'^a(?:[ \t][^\n]*)?$', re.MULTILINE)
+
+def _get_decompressor(filename):
+  """ Return a function to open a compressed file or None if it is not compressed. """
+  with open(filename, 'rb') as file:
+    magic = file.read(6)
+  for magic_bytes, opener in _COMPRESSION_FORMATS:
+    if magic.startswith(magic_bytes):
+      return opener
+  return None
+
 class Dimacs(object):
-  
-  def __init__(self, clauses):
-    self.clauses = clauses
-    self.num_clauses = len(self.clauses)
-    self.num_vars = max([0] + [max([0] + [abs(l) for l in c]) for c in self.clauses])
+  """ A CNF formula. Clauses are stored in compressed sparse row form: a flat
+      int32 buffer holding the literals of all clauses back to back, and an
+      int64 buffer of num_clauses+1 offsets such that clause i consists of the
+      literals literals[offsets[i]:offsets[i+1]]. """
+
+  # Number of bytes of packed literal values check_model evaluates at a time.
+  CHECK_BUFFER_SIZE = 1 << 24
+
+  def __init__(self, clauses=None, literals=None, offsets=None, num_vars=None):
+    if clauses is not None:
+      literals = np.fromiter(itertools.chain.from_iterable(clauses), dtype=np.int32)
+      offsets = np.zeros(len(clauses) + 1, dtype=np.int64)
+      np.cumsum([len(c) for c in clauses], out=offsets[1:])
+    # Wrap the buffers without copying (e.g. array.array objects from the parser).
+    self.literals = np.asarray(literals, dtype=np.int32).view()
+    self.offsets = np.asarray(offsets, dtype=np.int64).view()
+    self.literals.flags.writeable = False
+    self.offsets.flags.writeable = False
+    self.num_clauses = len(self.offsets) - 1
+    if num_vars is None:
+      num_vars = int(np.abs(self.literals).max()) if len(self.literals) > 0 else 0
+    self.num_vars = num_vars
+    self.__occurrence_index = None
+
+  @property
+  def clauses(self):
+    """ The clauses as a list of lists of ints (this builds Python objects for
+        every literal; prefer clause() or the literal buffer for large inputs). """
+    literals = self.literals.tolist()
+    offsets = self.offsets.tolist()
+    return [literals[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+  def clause(self, index):
+    """ Return clause number 'index' as a view into the literal buffer. """
+    return self.literals[self.offsets[index]:self.offsets[index + 1]]
+
+  def clause_lengths(self):
+    """ Return the number of literals in each clause. """
+    return np.diff(self.offsets)
+
+  def check_model(self, assignment):
+    """ Return a boolean array that is True for every clause the assignment
+        falsifies. The assignment is a boolean array indexed by variable or a
+        list of signed literals (see DimacsUtils.get_assignment), or a batch
+        of assignments as a 2-D boolean array with one assignment per row, in
+        which case the result has one row per assignment. Empty clauses are
+        always falsified. """
+    assignment = DimacsUtils.get_assignment(assignment, self.num_vars)
+    falsified = np.ones(assignment.shape[:-1] + (self.num_clauses,), dtype=bool)
+    # reduceat needs a non-empty range per index, so empty clauses are skipped.
+    is_nonempty = np.diff(self.offsets) > 0
+    starts = self.offsets[:-1][is_nonempty]
+    if len(starts) == 0:
+      return falsified
+    variables = np.abs(self.literals)
+    # Assignments are bit-packed, eight per byte, with a row per variable. A
+    # gather then yields literal values for eight assignments per byte, which
+    # are flipped for negative literals and or-ed together per clause.
+    flips = np.where(self.literals < 0, np.uint8(0xff), np.uint8(0))[:, np.newaxis]
+    rows = assignment.reshape(-1, assignment.shape[-1])
+    results = falsified.reshape(-1, self.num_clauses)
+    # Check a batch a few bytes at a time to bound the temporary arrays.
+    num_rows = 8 * max(1, self.CHECK_BUFFER_SIZE // len(variables))
+    for start in range(0, len(rows), num_rows):
+      batch = rows[start:start + num_rows]
+      packed = np.ascontiguousarray(np.packbits(batch, axis=0).T)
+      values = packed[variables]
+      values ^= flips
+      satisfied = np.bitwise_or.reduceat(values, starts, axis=0)
+      results[start:start + num_rows, is_nonempty] = np.unpackbits(satisfied, axis=1, count=len(batch)).T == 0
+    return falsified
+
+  def compact(self):
+    """ Renumber the variables that occur in the formula to 1..n, keeping their
+        order. Returns the renumbered Dimacs object, a forward map such that
+        old variable v is forward_map[v] (0 if v does not occur) and an inverse
+        map such that new variable v is inverse_map[v]. Entry 0 of both maps is
+        0, so a model of the new formula (a boolean array indexed by variable)
+        translates back with model[forward_map] and a model of the original
+        formula translates forward with model[inverse_map]. """
+    variables = np.abs(self.literals)
+    is_used = np.zeros(self.num_vars + 1, dtype=bool)
+    is_used[variables] = True
+    is_used[0] = True
+    inverse_map = np.flatnonzero(is_used).astype(np.int32)
+    forward_map = np.zeros(self.num_vars + 1, dtype=np.int32)
+    forward_map[inverse_map] = np.arange(len(inverse_map), dtype=np.int32)
+    literals = forward_map[variables]
+    np.negative(literals, out=literals, where=self.literals < 0)
+    return Dimacs(literals=literals, offsets=self.offsets, num_vars=len(inverse_map) - 1), forward_map, inverse_map
+
+  def occurrence_index(self):
+    """ Return the OccurrenceIndex of the formula, which is built on first use
+        and shared by later calls. """
+    if self.__occurrence_index is None:
+      self.__occurrence_index = OccurrenceIndex(self.literals, self.offsets, self.num_vars)
+    return self.__occurrence_index
+
+  def fingerprint(self):
+    """ Return a canonical hash of the formula (a sha256 hex digest) that does
+        not depend on the order of the clauses or of the literals within
+        them. Every clause is hashed independently of literal order in a few
+        vectorized passes, and the sorted clause hashes are digested together
+        with the number of variables and clauses. Duplicate literals and
+        clauses are significant. """
+    digest = hashlib.sha256()
+    self._update_fingerprint(digest)
+    return digest.hexdigest()
+
+  def _update_fingerprint(self, digest):
+    digest.update(b"%s %d %d\n" % (type(self).__name__.lower().encode(), self.num_vars, self.num_clauses))
+    digest.update(np.sort(self._get_clause_hashes()).astype('<u8').tobytes())
+
+  def _get_clause_hashes(self):
+    return DimacsUtils.get_clause_hashes(self.literals, self.offsets)
+
+  def stats(self):
+    """ Compute a DimacsStats summary of the formula. """
+    occurrence_index = self.occurrence_index()
+    return DimacsStats(
+      clause_length_histogram=np.bincount(self.clause_lengths()),
+      positive_occurrences=occurrence_index.get_positive_counts(),
+      negative_occurrences=occurrence_index.get_negative_counts())
+
+class Wcnf(Dimacs):
+  """ A weighted (partial) MaxSAT formula: a CNF formula with an int64 weight
+      per clause, held in an array parallel to the clause offsets. Clauses
+      with a weight of at least top are hard. By default, every clause is soft
+      and top is one more than the sum of the weights. """
+
+  def __init__(self, clauses=None, weights=None, top=None, literals=None, offsets=None, num_vars=None):
+    super().__init__(clauses=clauses, literals=literals, offsets=offsets, num_vars=num_vars)
+    if weights is None:
+      weights = np.ones(self.num_clauses, dtype=np.int64)
+    self.weights = np.asarray(weights, dtype=np.int64).view()
+    self.weights.flags.writeable = False
+    if len(self.weights) != self.num_clauses:
+      raise Exception("error: the number of weights (%d) does not match the number of clauses (%d)" % (
+        len(self.weights), self.num_clauses))
+    if top is None:
+      top = _sum_weights(self.weights) + 1
+    self.top = top
+
+  def is_hard(self):
+    """ Return a boolean array that is True for every hard clause. """
+    return self.weights >= self.top
+
+  def _get_clause_hashes(self):
+    # Hard clauses hash with weight 0, which soft clauses cannot have.
+    weights = np.where(self.is_hard(), 0, self.weights)
+    return DimacsUtils.hash_literals((super()._get_clause_hashes() ^ DimacsUtils.hash_literals(weights)).view(np.int64))
+
+class Qdimacs(Dimacs):
+  """ A quantified CNF formula (QDIMACS). The quantifier prefix is held in
+      compact form like the clauses: block i quantifies the variables
+      quantifier_variables[quantifier_offsets[i]:quantifier_offsets[i+1]],
+      universally if quantifier_types[i] is b'a' and existentially if it is
+      b'e'. The prefix can also be given as a list of (type, variables) pairs,
+      e.g. [('a', [1, 2]), ('e', [3])]. """
+
+  def __init__(self, clauses=None, quantifiers=None, literals=None, offsets=None, num_vars=None,
+               quantifier_types=None, quantifier_variables=None, quantifier_offsets=None):
+    super().__init__(clauses=clauses, literals=literals, offsets=offsets, num_vars=num_vars)
+    if quantifiers is not None:
+      quantifier_types = [quantifier for quantifier, _ in quantifiers]
+      quantifier_variables = list(itertools.chain.from_iterable(variables for _, variables in quantifiers))
+      quantifier_offsets = np.zeros(len(quantifiers) + 1, dtype=np.int64)
+      np.cumsum([len(variables) for _, variables in quantifiers], out=quantifier_offsets[1:])
+    elif quantifier_types is None:
+      quantifier_types, quantifier_variables, quantifier_offsets = [], [], [0]
+    self.quantifier_types = np.asarray(quantifier_types, dtype='S1').view()
+    self.quantifier_variables = np.asarray(quantifier_variables, dtype=np.int32).view()
+    self.quantifier_offsets = np.asarray(quantifier_offsets, dtype=np.int64).view()
+    for buffer in (self.quantifier_types, self.quantifier_variables, self.quantifier_offsets):
+      buffer.flags.writeable = False
+
+  @property
+  def quantifiers(self):
+    """ The quantifier prefix as a list of (type, variables) pairs. """
+    variables = self.quantifier_variables.tolist()
+    offsets = self.quantifier_offsets.tolist()
+    return [(quantifier.decode(), variables[start:end])
+      for quantifier, start, end in zip(self.quantifier_types.tolist(), offsets[:-1], offsets[1:])]
+
+  def _update_fingerprint(self, digest):
+    # The order of the blocks matters, the order of variables within a block
+    # does not.
+    super()._update_fingerprint(digest)
+    block_ids = DimacsUtils.get_clause_ids(self.quantifier_offsets)
+    order = np.lexsort((self.quantifier_variables, block_ids))
+    digest.update(self.quantifier_types.tobytes())
+    digest.update(np.diff(self.quantifier_offsets).astype('<i8').tobytes())
+    digest.update(self.quantifier_variables[order].astype('<i4').tobytes())
+
+class DimacsStats(object):
+  """ Statistics of a CNF formula. The occurrence arrays are indexed by variable
+      (entry 0 is unused) and clause_length_histogram[n] is the number of
+      clauses with n literals. """
+
+  def __init__(self, clause_length_histogram, positive_occurrences, negative_occurrences):
+    self.clause_length_histogram = clause_length_histogram
+    self.positive_occurrences = positive_occurrences
+    self.negative_occurrences = negative_occurrences
+    self.num_unit_clauses = self.__get_num_clauses_of_length(1)
+    self.num_binary_clauses = self.__get_num_clauses_of_length(2)
+
+  def __get_num_clauses_of_length(self, length):
+    return int(self.clause_length_histogram[length]) if length < len(self.clause_length_histogram) else 0
+
+class DimacsHeader(object):
+  """ The problem statement of a DIMACS file. """
+
+  def __init__(self, num_vars, num_clauses, line_no):
+    self.num_vars = num_vars
+    self.num_clauses = num_clauses
+    self.line_no = line_no
 
 class DimacsParser(object):
 
-  def __init__(self, filename=None, file=None, string=None):
+  # Number of characters read from a file at a time.
+  CHUNK_SIZE = 1 << 20
+
+  # Number of chunks the clause section is split into per worker process.
+  CHUNKS_PER_WORKER = 4
+
+  def __init__(self, filename=None, file=None, string=None, lazy=False, use_mmap=False, workers=None, wcnf=False,
+               qdimacs=False, icnf=False):
     self.in_filename = filename
     self.in_file = file
     self.in_string = string
+    self.use_mmap = use_mmap
+    self.workers = workers
     self.line_no = None
     self.num_vars = 0
     self.num_clauses = 0
     self.problem_statement_line = 0
     self.problem_statement_num_vars_column = 0
     self.problem_statement_num_clauses_column = 0
-    self.seen_clause = False
     self.seen_problem_statement = False
-    self.clauses = []
+    self.literals = array.array('i')
+    self.offsets = array.array('q', [0])
+    self.actual_num_clauses = 0
     self.max_var = 0
-    self.__parse()
+    # In WCNF mode every clause starts with a weight (or 'h' for hard clauses)
+    # and there may be no problem statement.
+    self.wcnf = wcnf
+    self.weights = array.array('q')
+    self.pending_weight = None
+    self.declared_top = None
+    self.top = None
+    self.soft_weight_sum = 0
+    # In QDIMACS mode, quantifier lines may follow the problem statement. The
+    # blocks are kept in compact form like the clauses.
+    self.qdimacs = qdimacs
+    self.seen_clause_section = False
+    self.quantifier_types = bytearray()
+    self.quantifier_variables = array.array('i')
+    self.quantifier_offsets = array.array('q', [0])
+    # In iCNF mode, assumption lines may appear between the clauses. Each one
+    # is recorded as a query: the number of clauses in the buffers before it
+    # and the assumed literals.
+    self.icnf = icnf
+    self.queries = []
+    self.decompressor = None
+    if self.in_filename is not None:
+      self.decompressor = _get_decompressor(self.in_filename)
+    if not lazy:
+      for _ in self.__parse():
+        pass
  
   def get_num_vars(self):
     return self.num_vars
 
   def get_num_clauses(self):
-    return len(self.clauses)
+    return self.actual_num_clauses
 
   def get_clauses(self):
-    return self.clauses
+    literals = self.literals.tolist()
+    offsets = self.offsets.tolist()
+    return [literals[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+  def iter_clauses(self):
+    """ Parse the input, yielding each clause as soon as it is complete. The
+        declared number of variables and clauses are checked once the input is
+        exhausted, i.e. after the last clause has been yielded. """
+    for _ in self.__parse():
+      yield from self.get_clauses()
+      self.__discard_clauses()
+
+  def validate(self):
+    """ Parse the input, applying all the usual checks, without keeping any of
+        its clauses. Returns the problem statement as a DimacsHeader. """
+    for _ in self.__parse():
+      self.__discard_clauses()
+    return DimacsHeader(self.num_vars, self.num_clauses, self.problem_statement_line)
+
+  def iter_queries(self):
+    """ Parse iCNF input, yielding a (Dimacs, assumptions) pair for every
+        assumption line, holding the clauses since the previous one and the
+        assumed literals. Clauses after the last assumption line are yielded
+        with None for the assumptions. """
+    for _ in self.__parse():
+      yield from self.__take_queries()
+    yield from self.__take_queries()
+    if len(self.offsets) > 1:
+      literals, offsets = self.__take_clauses(len(self.offsets) - 1)
+      yield Dimacs(literals=literals, offsets=offsets, num_vars=self.max_var), None
+
+  def __take_queries(self):
+    """ Yield the queries recorded so far. The clauses of all of them are taken
+        from the buffers in one go and each query gets a slice of them. """
+    queries = self.queries
+    self.queries = []
+    if not queries:
+      return
+    literals, offsets = self.__take_clauses(queries[-1][0])
+    ends = offsets.tolist()
+    taken = 0
+    for num_clauses, assumptions in queries:
+      start = ends[taken]
+      dimacs = Dimacs(literals=literals[start:ends[num_clauses]], offsets=offsets[taken:num_clauses + 1] - start,
+        num_vars=self.max_var)
+      yield dimacs, assumptions
+      taken = num_clauses
+
+  def __take_clauses(self, num_clauses):
+    """ Remove the first num_clauses clauses from the buffers and return a copy
+        of their literals and offsets. """
+    offsets = np.asarray(self.offsets)
+    end = offsets[num_clauses]
+    literals = np.frombuffer(self.literals, dtype=np.int32, count=end).copy()
+    taken_offsets = offsets[:num_clauses + 1].copy()
+    del self.literals[:end]
+    self.offsets = array.array('q', (offsets[num_clauses:] - end).tobytes())
+    return literals, taken_offsets
+
+  def __discard_clauses(self):
+    """ Drop all completed clauses from the buffers. """
+    del self.literals[:self.offsets[-1]]
+    self.offsets = array.array('q', [0])
+    self.weights = array.array('q')
   
+  def parse_header(self):
+    """ Process the input up to and including the problem statement only and
+        return it as a DimacsHeader. """
+    self.line_no = 1
+    for line in self.__read_header_lines():
+      self.__process_line(line)
+      if self.seen_problem_statement:
+        return DimacsHeader(self.num_vars, self.num_clauses, self.problem_statement_line)
+    self.__process_error("missing problem statement")
+
+  def __read_header_lines(self):
+    if self.in_filename is not None:
+      opener = open if self.decompressor is None else self.decompressor
+      with opener(self.in_filename, 'rb') as file:
+        for line in file:
+          yield line.rstrip(b'\n').decode('latin-1')
+    if self.in_file is not None:
+      for line in self.in_file:
+        yield line.rstrip('\n')
+    if self.in_string is not None:
+      pos = 0
+      while pos <= len(self.in_string):
+        end = self.in_string.find('\n', pos)
+        if end == -1:
+          end = len(self.in_string)
+        yield self.in_string[pos:end]
+        pos = end + 1
+
   def __process_problem_statement(self, num_vars, num_clauses):
     self.num_vars = num_vars
     self.num_clauses = num_clauses
     self.seen_problem_statement = True
 
-  def __process_start_of_clause(self):
-    self.clauses.append([])
-
-  def __process_clause_literal(self, literal):
-    self.clauses[-1].append(literal)
-    abs_literal = abs(literal)
-    if abs_literal > self.max_var:
-      self.max_var = abs_literal
+  def __read_blocks(self):
+    """ Yield the input as blocks of complete lines. """
+    if self.in_filename is not None and not self.use_mmap and \
+       (self.workers is None or self.workers <= 1) and self.decompressor is None:
+      with open(self.in_filename, 'r') as file:
+        yield from self.__read_file_blocks(file)
+    if self.in_file is not None:
+      if hasattr(self.in_file, 'read'):
+        yield from self.__read_file_blocks(self.in_file)
+      else:
+        lines = [line if line.endswith('\n') else line + '\n' for line in self.in_file]
+        yield ''.join(lines)
+    if self.in_string is not None:
+      yield self.in_string
 
-  def __process_end_of_clause(self ):
-    pass
+  def __read_file_blocks(self, file):
+    remainder = ''
+    while True:
+      data = file.read(self.CHUNK_SIZE)
+      if not data:
+        break
+      cut = data.rfind('\n') + 1
+      if cut == 0:
+        remainder += data
+      else:
+        yield remainder + data[:cut]
+        remainder = data[cut:]
+    if remainder:
+      yield remainder
 
   def __parse(self):
     self.line_no = 1
 
-    if self.in_filename is not None:
-      file = open(self.in_filename, 'r')
-      for line in file:
-        self.__process_line(line)
-      file.close()
-    if self.in_file is not None:
-      for line in self.in_file:
-        self.__process_line(line)
-    if self.in_string is not None:
-      for line in self.in_string.split('\n'):
-        self.__process_line(line)
+    if self.decompressor is not None:
+      yield from self.__parse_compressed()
+    elif self.in_filename is not None and self.workers is not None and self.workers > 1:
+      yield from self.__parse_parallel()
+    elif self.in_filename is not None and self.use_mmap:
+      yield from self.__parse_mmap()
+
+    for block in self.__read_blocks():
+      self.__process_block(block)
+      yield
+
+    # A final clause need not be terminated by a '0'.
+    if self.wcnf:
+      if self.pending_weight is not None:
+        self.__append_weights([self.pending_weight])
+        self.pending_weight = None
+        self.offsets.append(len(self.literals))
+        self.actual_num_clauses += 1
+        yield
+    elif len(self.literals) > self.offsets[-1]:
+      self.offsets.append(len(self.literals))
+      self.actual_num_clauses += 1
+      yield
+
+    if self.qdimacs:
+      self.__check_quantifier_blocks()
+
+    if self.icnf and self.seen_problem_statement:
+      # Nothing is declared, so there is nothing to check.
+      return
+
+    if self.wcnf:
+      self.__process_top()
+      if self.problem_statement_line == 0:
+        # Nothing was declared, so there is nothing to check.
+        return
 
-    #max_var = max([max([abs(l) for l in c]) for c in self.clauses])
-    
     if self.num_vars < self.max_var:
       self.__process_error_with_location("the declared number of variables (%d) is smaller than the actual number of variables (%d)" % (
         self.num_vars,
@@ -77,28 +514,196 @@ class DimacsParser(object):
         self.problem_statement_line,
         self.problem_statement_num_vars_column)
 
-    if self.num_clauses != len(self.clauses):
+    if self.num_clauses != self.actual_num_clauses:
       self.__process_error_with_location("the declared number of clauses (%d) does not match the actual number of clauses (%d)" % (
         self.num_clauses,
-        len(self.clauses)),
+        self.actual_num_clauses),
         self.problem_statement_line,
         self.problem_statement_num_clauses_column)
 
     if not self.seen_problem_statement:
       self.__process_error("missing problem statement")
 
+  def __parse_mmap(self):
+    with open(self.in_filename, 'rb') as file:
+      size = os.fstat(file.fileno()).st_size
+      if size > 0:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+          yield from self.__process_buffer(buffer, 0, size)
+        finally:
+          buffer.close()
+
+  def __parse_parallel(self):
+    """ Parse the header here and the clause section in a process pool. """
+    with open(self.in_filename, 'rb') as file:
+      size = os.fstat(file.fileno()).st_size
+      if size > 0:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+          pos = self.__process_header(buffer, 0, size)
+          chunks = self.__split_clause_section(buffer, pos, size, self.workers * self.CHUNKS_PER_WORKER)
+          with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(DimacsParser._parse_chunk,
+              [self.in_filename] * len(chunks),
+              [start for start, _ in chunks],
+              [end for _, end in chunks])
+            for (start, end), result in zip(chunks, results):
+              if result is None:
+                # Parse the chunk again here to report the error with the
+                # right line number.
+                for _ in self.__process_buffer(buffer, start, end):
+                  pass
+              else:
+                self.__process_chunk_result(*result)
+              yield
+        finally:
+          buffer.close()
+
+  @staticmethod
+  def __split_clause_section(buffer, start, end, num_chunks):
+    """ Split buffer[start:end] into ranges that end with a clause-terminating '0'. """
+    chunks = []
+    target_size = max(1, (end - start) // num_chunks)
+    while start < end:
+      match = _CLAUSE_BOUNDARY.search(buffer, min(start + target_size, end) - 1, end)
+      chunk_end = end if match is None else match.end()
+      chunks.append((start, chunk_end))
+      start = chunk_end
+    return chunks
+
+  @staticmethod
+  def _parse_chunk(filename, start, end):
+    """ Parse the clause lines in a byte range of a file (in a worker process).
+        Returns the literals, the clause ends, the largest variable and the
+        number of newlines, or None if the range contains an error. """
+    parser = DimacsParser(lazy=True)
+    parser.seen_problem_statement = True
+    parser.line_no = 0
+    # Keep a '0' that starts the chunk: it may end a clause started in the
+    # previous chunk. Duplicate ends are dropped when the chunks are stitched.
+    parser.offsets = array.array('q', [-1])
+    try:
+      with open(filename, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+          for _ in parser.__process_buffer(buffer, start, end):
+            pass
+        finally:
+          buffer.close()
+    except Exception:
+      return None
+    return np.asarray(parser.literals), np.asarray(parser.offsets[1:]), parser.max_var, parser.line_no
+
+  def __process_chunk_result(self, literals, ends, max_var, num_newlines):
+    ends = ends + len(self.literals)
+    ends = ends[np.diff(ends, prepend=self.offsets[-1]) > 0]
+    self.literals.frombytes(literals.tobytes())
+    self.offsets.frombytes(ends.tobytes())
+    self.actual_num_clauses += len(ends)
+    self.max_var = max(self.max_var, max_var)
+    self.line_no += num_newlines
+
+  def __parse_compressed(self):
+    """ Decompress the file on the fly and parse it in blocks of complete lines. """
+    with self.decompressor(self.in_filename, 'rb') as file:
+      remainder = b''
+      while True:
+        data = file.read(self.CHUNK_SIZE)
+        if not data:
+          break
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+          remainder += data
+        else:
+          block = remainder + data[:cut]
+          remainder = data[cut:]
+          yield from self.__process_buffer(block, 0, len(block))
+      if remainder:
+        yield from self.__process_buffer(remainder, 0, len(remainder))
+
+  def __process_header(self, buffer, start, size):
+    """ Process lines up to and including the problem statement. Returns the
+        position of the first line after it. """
+    pos = start
+    while self.__is_in_header() and pos < size:
+      end = buffer.find(b'\n', pos, size)
+      if end == -1:
+        end = size
+      line = buffer[pos:end].decode('latin-1')
+      if not self.__is_header_line(line):
+        break
+      self.__process_line(line)
+      pos = end + 1
+    return pos
+
+  def __process_buffer(self, buffer, start, size):
+    """ Parse buffer[start:size] of a bytes-like object (e.g. a memory-mapped
+        file) in place. Only the lines up to the problem statement are decoded. """
+    pos = self.__process_header(buffer, start, size)
+    while pos < size:
+      end = min(pos + self.CHUNK_SIZE, size)
+      if end < size:
+        # Make sure the chunk ends with a complete line.
+        cut = buffer.rfind(b'\n', pos, end)
+        if cut == -1:
+          cut = buffer.find(b'\n', end, size)
+        end = size if cut == -1 else cut + 1
+      self.__process_clause_bytes(buffer, pos, end)
+      pos = end
+      yield
+
+  def __process_block(self, block):
+    # Everything up to and including the problem statement is processed line
+    # by line, the clauses that follow are processed in bulk.
+    pos = 0
+    while self.__is_in_header() and pos < len(block):
+      end = block.find('\n', pos)
+      if end == -1:
+        end = len(block)
+      line = block[pos:end]
+      if not self.__is_header_line(line):
+        break
+      self.__process_line(line)
+      pos = end + 1
+    if pos < len(block):
+      self.__process_clause_lines(block[pos:] if pos > 0 else block)
+
+  def __is_in_header(self):
+    return not self.seen_problem_statement or (self.qdimacs and not self.seen_clause_section)
+
+  def __is_header_line(self, line):
+    """ Returns whether a line belongs to the header. In QDIMACS mode, this is
+        the case for quantifier lines following the problem statement. """
+    if self.seen_problem_statement and not (len(line) == 0 or line[0] in 'aec'):
+      self.seen_clause_section = True
+      return False
+    return True
+
   def __process_line(self, line):
     if len(line) > 0:
       if line[0] == 'c':
         pass
-      elif not self.seen_problem_statement and line[0] == 'p':
+      elif self.qdimacs and self.seen_problem_statement and line[0] in 'ae':
+        self.__process_quantifier_line(line)
+      elif line[0] == 'p' and self.icnf:
+        line_frags = self.__split_string(line)
+        if len(line_frags) < 2 or line_frags[0][0] != 'p':
+          self.__raise_syntax_error(self.line_no, 1)
+        elif line_frags[1][0] != 'inccnf':
+          self.__raise_syntax_error(self.line_no, line_frags[1][1][0]+1)
+        elif len(line_frags) > 2:
+          self.__raise_syntax_error(self.line_no, line_frags[2][1][0]+1)
+        self.problem_statement_line = self.line_no
+        self.__process_problem_statement(0, 0)
+      elif line[0] == 'p':
         #tokens = line.split()
         line_frags = self.__split_string(line)
-        if len(line_frags) != 4:
+        if len(line_frags) != 4 and not (self.wcnf and len(line_frags) == 5):
            self.__raise_syntax_error(self.line_no, 1)
         elif line_frags[0][0] != 'p':
            self.__raise_syntax_error(self.line_no, line_frags[0][1][0]+1)
-        elif line_frags[1][0] != 'cnf':
+        elif line_frags[1][0] != ('wcnf' if self.wcnf else 'cnf'):
            self.__raise_syntax_error(self.line_no, line_frags[1][1][0]+1)
         else:
           self.problem_statement_line = self.line_no
@@ -108,30 +713,371 @@ class DimacsParser(object):
             num_vars = int(line_frags[2][0])
             try:
               num_clauses = int(line_frags[3][0])
+              if len(line_frags) == 5:
+                self.__process_declared_top(line_frags[4])
               self.__process_problem_statement(num_vars, num_clauses)
             except ValueError:
               self.__raise_syntax_error(self.line_no, line_frags[3][1][0]+1)
           except ValueError:
             self.__raise_syntax_error(self.line_no, line_frags[2][1][0]+1)
-      elif self.seen_problem_statement:
-        line_frags = self.__split_string(line)
-        for token, (col_start, _) in line_frags:
-          try:
-            literal = int(token)
-            if literal == 0:
-              if self.seen_clause:
-                self.__process_end_of_clause()
-                self.seen_clause = False
-            else: # literal != 0
-              if not self.seen_clause:
-                self.__process_start_of_clause()
-                self.seen_clause = True
-              self.__process_clause_literal(literal)
-          except ValueError:
-            self.__raise_syntax_error(self.line_no, col_start+1)
+      elif self.wcnf:
+        # WCNF input in the newer format starts its clauses without a problem
+        # statement.
+        self.seen_problem_statement = True
+        self.__process_clause_lines(line + '\n')
+        return
       else:
         self.__process_error_with_location("expected a problem statement or comment on this line", self.line_no, 1)
     self.line_no += 1
+
+  def __process_quantifier_line(self, line):
+    """ Record a quantifier block: 'a' or 'e' followed by variables and a '0'. """
+    line_frags = self.__split_string(line)
+    if line_frags[0][0] not in ('a', 'e'):
+      self.__raise_syntax_error(self.line_no, 1)
+    variables = self.__parse_terminated_line(line, line_frags, "quantifier block", "variable")
+    self.quantifier_types.append(ord(line_frags[0][0]))
+    self.quantifier_variables.extend(variables)
+    self.quantifier_offsets.append(len(self.quantifier_variables))
+
+  def __process_assumption_line(self, line):
+    """ Record a query: 'a' followed by the assumed literals and a '0'. """
+    if len(self.literals) > self.offsets[-1]:
+      self.__process_error_with_location("clause not terminated by '0'", self.line_no, 1)
+    line_frags = self.__split_string(line)
+    if line_frags[0][0] != 'a':
+      self.__raise_syntax_error(self.line_no, 1)
+    literals = self.__parse_terminated_line(line, line_frags, "assumption list", "literal")
+    self.queries.append((len(self.offsets) - 1, np.array(literals, dtype=np.int32)))
+    self.line_no += 1
+
+  def __parse_terminated_line(self, line, line_frags, kind, item):
+    """ Parse the numbers following the first token of a line, which must end
+        with a '0'. Literals may be negative, variables may not. Returns the
+        numbers without the '0'. """
+    values = []
+    for token, (col_start, _) in line_frags[1:]:
+      try:
+        value = int(token)
+      except ValueError:
+        self.__raise_syntax_error(self.line_no, col_start+1)
+      if values and values[-1] == 0:
+        self.__process_error_with_location("unexpected token after the end of the %s" % kind, self.line_no, col_start+1)
+      if abs(value) > MAX_VAR or (item == "variable" and value < 0):
+        self.__process_error_with_location("%s out of range" % item, self.line_no, col_start+1)
+      values.append(value)
+    if not values or values[-1] != 0:
+      self.__process_error_with_location("%s not terminated by '0'" % kind, self.line_no, len(line.rstrip())+1)
+    if len(values) > 1:
+      self.max_var = max(self.max_var, max(abs(value) for value in values))
+    return values[:-1]
+
+  def __check_quantifier_blocks(self):
+    variables = np.asarray(self.quantifier_variables)
+    unique, counts = np.unique(variables, return_counts=True)
+    if np.any(counts > 1):
+      self.__process_error("variable %d is quantified more than once" % unique[np.argmax(counts > 1)])
+
+  def __process_clause_lines(self, text):
+    """ Convert a block of complete lines following the problem statement to
+        literals in one go. Token positions are only worked out if there is an
+        error to report. """
+    if self.icnf:
+      try:
+        data = text.encode('latin-1')
+      except UnicodeEncodeError:
+        data = None
+      if data is None or not self.__process_icnf_range(data, 0, len(data)):
+        self.__process_icnf_lines(text)
+      return
+    self.__process_clause_text(text)
+
+  def __process_icnf_lines(self, text):
+    """ Process iCNF clause and assumption lines stretch by stretch, which
+        reports errors at their line. """
+    pos = 0
+    for match in _ASSUMPTION_LINE.finditer(text):
+      if match.start() > pos:
+        self.__process_clause_text(text[pos:match.start()])
+      self.__process_assumption_line(match.group())
+      pos = match.end() + 1
+    if pos < len(text):
+      self.__process_clause_text(text[pos:])
+
+  def __process_clause_text(self, text):
+    clause_text = text
+    if text[0] == 'c' or '\nc' in text:
+      clause_text = '\n'.join(line for line in text.split('\n') if not line.startswith('c'))
+    try:
+      if self.wcnf and 'h' in clause_text:
+        words = clause_text.split()
+        is_hard = np.array([word == 'h' for word in words], dtype=bool)
+        tokens = np.array([1 if word == 'h' else int(word) for word in words], dtype=np.int64)
+      else:
+        tokens = np.array(list(map(int, clause_text.split())), dtype=np.int64)
+        is_hard = np.zeros(len(tokens), dtype=bool)
+    except (ValueError, OverflowError):
+      self.__raise_clause_error(text)
+    if self.wcnf:
+      is_weight = self.__get_weight_positions(tokens, is_hard)
+      if is_weight is None:
+        self.__raise_clause_error(text)
+      self.__process_wcnf_tokens(tokens, is_hard, is_weight)
+    else:
+      if len(tokens) > 0 and np.abs(tokens).max() > MAX_VAR:
+        self.__raise_clause_error(text)
+      self.__process_tokens(tokens)
+    self.line_no += text.count('\n')
+
+  def __process_clause_bytes(self, buffer, start, end):
+    if self.icnf:
+      if self.__process_icnf_range(buffer, start, end):
+        return
+      for match in _ASSUMPTION_LINE_BYTES.finditer(buffer, start, end):
+        if match.start() > start:
+          self.__process_clause_range(buffer, start, match.start())
+        self.__process_assumption_line(match.group().decode('latin-1'))
+        start = min(match.end() + 1, end)
+      if start == end:
+        return
+    self.__process_clause_range(buffer, start, end)
+
+  def __process_icnf_range(self, buffer, start, end):
+    """ Process the clause and assumption lines in buffer[start:end] with a
+        single scan. The 'a' of each assumption line is blanked out, so that
+        its literals are scanned along with those of the clauses, and the
+        token positions tell them apart. Returns False without changing
+        anything if the range holds anything out of the ordinary, which is
+        then left to the stretch by stretch path. """
+    data = np.frombuffer(buffer, dtype=np.uint8, count=end-start, offset=start)
+    newlines = np.flatnonzero(data == _NEWLINE_BYTE)
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_starts = line_starts[line_starts < len(data)]
+    # An 'a' followed by a space, a tab or the end of the line.
+    is_assumption_line = (data[line_starts] == _ASSUMPTION_BYTE) & \
+      np.isin(np.append(data, np.uint8(_NEWLINE_BYTE))[line_starts + 1], [ord(' '), ord('\t'), _NEWLINE_BYTE])
+    if not np.any(is_assumption_line):
+      # Release the view first, so that an error does not keep a memory map
+      # from being closed.
+      del data
+      self.__process_clause_range(buffer, start, end)
+      return True
+    assumption_starts = line_starts[is_assumption_line]
+    data = data.copy()
+    data[assumption_starts] = ord(' ')
+    tokens, _, num_newlines, token_starts = self.__scan_clause_bytes(data, 0, len(data))
+    if tokens is None:
+      return False
+
+    # Split the tokens into those of the clauses and of the assumption lines.
+    token_lines = np.searchsorted(line_starts, token_starts, side='right') - 1
+    is_assumption = is_assumption_line[token_lines]
+    assumption_tokens = tokens[is_assumption]
+    assumption_ids = np.cumsum(is_assumption_line)[token_lines[is_assumption]] - 1
+    num_assumption_tokens = np.bincount(assumption_ids, minlength=len(assumption_starts))
+    # Each assumption line holds a single '0', as its last token.
+    if num_assumption_tokens.min() == 0 or \
+       np.count_nonzero(assumption_tokens == 0) != len(assumption_starts) or \
+       np.any(assumption_tokens[np.cumsum(num_assumption_tokens) - 1] != 0):
+      return False
+    clause_tokens = tokens[~is_assumption]
+    # Whether a clause is open after each number of clause tokens. None may be
+    # open at an assumption line.
+    is_open = np.concatenate(([len(self.literals) > self.offsets[-1]], clause_tokens != 0))
+    num_tokens_before = np.searchsorted(token_starts, assumption_starts) - \
+      (np.cumsum(num_assumption_tokens) - num_assumption_tokens)
+    if np.any(is_open[num_tokens_before]):
+      return False
+
+    # A query holds the clauses completed before its assumption line.
+    is_end = (clause_tokens == 0) & is_open[:-1]
+    num_clauses = np.concatenate(([0], np.cumsum(is_end)))[num_tokens_before] + len(self.offsets) - 1
+    assumed = assumption_tokens[assumption_tokens != 0].astype(np.int32)
+    bounds = np.concatenate(([0], np.cumsum(num_assumption_tokens - 1))).tolist()
+    assumptions = [assumed[begin:end] for begin, end in zip(bounds[:-1], bounds[1:])]
+    self.__process_tokens(clause_tokens)
+    self.queries.extend(zip(num_clauses.tolist(), assumptions))
+    if len(assumption_tokens) > len(assumption_starts):
+      self.max_var = max(self.max_var, int(np.abs(assumption_tokens).max()))
+    self.line_no += num_newlines
+    return True
+
+  def __process_clause_range(self, buffer, start, end):
+    tokens, is_hard, num_newlines, _ = self.__scan_clause_bytes(buffer, start, end, self.wcnf)
+    is_weight = None
+    if tokens is not None and self.wcnf:
+      is_weight = self.__get_weight_positions(tokens, is_hard)
+    if tokens is None or (self.wcnf and is_weight is None):
+      # Anything out of the ordinary is left to the text path, which knows how
+      # to report errors.
+      self.__process_clause_text(buffer[start:end].decode('latin-1'))
+    else:
+      if self.wcnf:
+        self.__process_wcnf_tokens(tokens, is_hard, is_weight)
+      else:
+        self.__process_tokens(tokens)
+      self.line_no += num_newlines
+
+  @staticmethod
+  def __scan_clause_bytes(buffer, start, end, wcnf=False):
+    """ Convert the clause lines in buffer[start:end] to integer tokens without
+        copying or decoding them. Returns the tokens (or None if the bytes hold
+        anything other than plain decimal literals and comment lines), a mask
+        of the 'h' tokens that mark hard WCNF clauses (given the value 1), the
+        number of newlines in the range and the position of each token in it. In WCNF mode, tokens are weights
+        as well as literals, so their range is not checked here. """
+    data = np.frombuffer(buffer, dtype=np.uint8, count=end-start, offset=start)
+    classes = _BYTE_CLASSES[data]
+    newlines = np.flatnonzero(data == _NEWLINE_BYTE)
+
+    # Blank out comment lines.
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_starts = line_starts[line_starts < len(data)]
+    comment_starts = line_starts[data[line_starts] == _COMMENT_BYTE]
+    if len(comment_starts) > 0:
+      comment_ends = np.searchsorted(newlines, comment_starts)
+      comment_ends = np.append(newlines, len(data))[comment_ends]
+      depth = np.zeros(len(data) + 1, dtype=np.int8)
+      depth[comment_starts] += 1
+      depth[comment_ends] -= 1
+      classes[np.cumsum(depth[:-1]) > 0] = _SPACE
+
+    if wcnf:
+      is_hard_byte = (data == _HARD_BYTE) & (classes == _OTHER)
+      classes[is_hard_byte] = _DIGIT
+    if np.any(classes == _OTHER):
+      return None, None, len(newlines), None
+
+    edges = np.diff((classes != _SPACE).view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    token_starts = np.flatnonzero(edges == 1)
+    token_ends = np.flatnonzero(edges == -1)
+    is_negative = classes[token_starts] == _MINUS
+    digit_starts = token_starts + is_negative
+    num_digits = token_ends - digit_starts
+    # A '-' must start a token and be followed by at least one digit, and
+    # literals with more than 10 digits can never fit in 32 bits (weights with
+    # more than 18 digits may not fit in 64 bits).
+    if np.count_nonzero(classes == _MINUS) != np.count_nonzero(is_negative) or \
+       (len(num_digits) > 0 and (num_digits.min() < 1 or num_digits.max() > (18 if wcnf else 10))):
+      return None, None, len(newlines), None
+
+    tokens = np.zeros(len(token_starts), dtype=np.int64)
+    last = len(data) - 1
+    for digit in range(int(num_digits.max()) if len(num_digits) > 0 else 0):
+      values = data[np.minimum(digit_starts + digit, last)] - np.int64(_ZERO_BYTE)
+      tokens = np.where(num_digits > digit, tokens * 10 + values, tokens)
+    np.negative(tokens, out=tokens, where=is_negative)
+    if wcnf:
+      # An 'h' must be a token of its own.
+      is_hard = (data[digit_starts] == _HARD_BYTE) & (num_digits == 1) & ~is_negative
+      if np.count_nonzero(is_hard) != np.count_nonzero(is_hard_byte):
+        return None, None, len(newlines), None
+      tokens[is_hard] = 1
+      return tokens, is_hard, len(newlines), token_starts
+    if len(tokens) > 0 and np.abs(tokens).max() > MAX_VAR:
+      return None, None, len(newlines), None
+    return tokens, None, len(newlines), token_starts
+
+  def __process_tokens(self, tokens):
+    """ Append clause literals to the buffers. Every '0' ends the current clause
+        unless that clause is empty. """
+    is_literal = tokens != 0
+    literals = tokens[is_literal].astype(np.int32)
+    zeros = np.flatnonzero(~is_literal)
+    ends = zeros - np.arange(len(zeros)) + len(self.literals)
+    ends = ends[np.diff(ends, prepend=self.offsets[-1]) > 0]
+    self.literals.frombytes(literals.tobytes())
+    self.offsets.frombytes(ends.tobytes())
+    self.actual_num_clauses += len(ends)
+    if len(literals) > 0:
+      self.max_var = max(self.max_var, int(np.abs(literals).max()))
+
+  def __get_weight_positions(self, tokens, is_hard):
+    """ Work out which WCNF tokens are weights: the first token of the input
+        and every token following a '0'. Returns a mask of the weights, or None
+        if there is an invalid weight, a misplaced 'h' or a literal that is out
+        of range. """
+    is_weight = np.zeros(len(tokens), dtype=bool)
+    zeros = np.flatnonzero(tokens == 0)
+    is_weight[zeros[zeros + 1 < len(tokens)] + 1] = True
+    if len(tokens) > 0 and self.pending_weight is None:
+      is_weight[0] = True
+    if np.any(is_weight & (tokens <= 0)) or np.any(is_hard & ~is_weight) or \
+       np.any(~is_weight & (np.abs(tokens) > MAX_VAR)):
+      return None
+    return is_weight
+
+  def __process_wcnf_tokens(self, tokens, is_hard, is_weight):
+    """ Append WCNF clause literals and weights to the buffers. """
+    is_literal = (tokens != 0) & ~is_weight
+    literals = tokens[is_literal].astype(np.int32)
+    zeros = np.flatnonzero(tokens == 0)
+    ends = np.cumsum(is_literal)[zeros] + len(self.literals)
+    weights = tokens[is_weight]
+    weights[is_hard[is_weight]] = _HARD_WEIGHT if self.declared_top is None else self.declared_top
+    if self.pending_weight is not None:
+      weights = np.concatenate(([self.pending_weight], weights))
+    self.pending_weight = int(weights[len(zeros)]) if len(weights) > len(zeros) else None
+    self.__append_weights(weights[:len(zeros)])
+    self.literals.frombytes(literals.tobytes())
+    self.offsets.frombytes(ends.tobytes())
+    self.actual_num_clauses += len(ends)
+    if len(literals) > 0:
+      self.max_var = max(self.max_var, int(np.abs(literals).max()))
+
+  def __append_weights(self, weights):
+    weights = np.asarray(weights, dtype=np.int64)
+    soft_weights = weights[weights != _HARD_WEIGHT]
+    if self.declared_top is not None:
+      soft_weights = soft_weights[soft_weights < self.declared_top]
+    self.soft_weight_sum += _sum_weights(soft_weights)
+    self.weights.frombytes(weights.tobytes())
+
+  def __process_declared_top(self, frag):
+    token, (col_start, _) = frag
+    try:
+      top = int(token)
+    except ValueError:
+      self.__raise_syntax_error(self.line_no, col_start+1)
+    if top <= 0 or top > MAX_WEIGHT:
+      self.__process_error_with_location("top weight out of range", self.line_no, col_start+1)
+    self.declared_top = top
+
+  def __process_top(self):
+    """ Settle the top weight and give hard clauses that weight. Without a
+        declared top, it is one more than the sum of the soft weights. """
+    if self.declared_top is not None:
+      self.top = self.declared_top
+      return
+    self.top = self.soft_weight_sum + 1
+    if self.top > MAX_WEIGHT:
+      self.__process_error("the sum of the soft clause weights is too large")
+    weights = np.frombuffer(self.weights, dtype=np.int64)
+    weights[weights == _HARD_WEIGHT] = self.top
+
+  def __raise_clause_error(self, text):
+    """ Find and report the first bad token in a block of clause lines. """
+    line_no = self.line_no
+    expect_weight = self.wcnf and self.pending_weight is None
+    for line in text.split('\n'):
+      if not line.startswith('c'):
+        for token, (col_start, _) in self.__split_string(line):
+          if expect_weight and token == 'h':
+            expect_weight = False
+            continue
+          try:
+            value = int(token)
+          except ValueError:
+            self.__raise_syntax_error(line_no, col_start+1)
+          if expect_weight:
+            if value <= 0 or value > MAX_WEIGHT:
+              self.__process_error_with_location("weight out of range", line_no, col_start+1)
+            expect_weight = False
+          elif abs(value) > MAX_VAR:
+            self.__process_error_with_location("literal out of range", line_no, col_start+1)
+          elif self.wcnf and value == 0:
+            expect_weight = True
+      line_no += 1
  
   def __process_error(self, error_msg):
     raise Exception("error: %s" % error_msg)
@@ -157,12 +1103,92 @@ class DimacsParser(object):
         result.append((s[token_start:i], (token_start,i)))
       was_in_token = is_in_token
     if was_in_token:
-      result.append((s[token_start], (token_start,len(s))))
+      result.append((s[token_start:], (token_start,len(s))))
     return result
 
-def read(filename=None, file=None, string=None):
-  dimacs_parser = DimacsParser(filename=filename, file=file, string=string)
-  return Dimacs(clauses=dimacs_parser.clauses)
+def _sum_weights(weights):
+  """ Sum an int64 array exactly, as a Python int. """
+  if len(weights) == 0:
+    return 0
+  if int(weights.max()) <= MAX_WEIGHT // len(weights):
+    return int(weights.sum())
+  return sum(weights.tolist())
+
+def iter_clauses(filename=None, file=None, string=None, use_mmap=False):
+  """ Return an iterator over the clauses of DIMACS input without storing them.
+      Errors in the problem statement are only raised after the last clause. """
+  dimacs_parser = DimacsParser(filename=filename, file=file, string=string, lazy=True, use_mmap=use_mmap)
+  return dimacs_parser.iter_clauses()
+
+def iter_icnf(filename=None, file=None, string=None, use_mmap=False):
+  """ Return an iterator over the queries of incremental (iCNF) input, which
+      starts with 'p inccnf' and interleaves clause lines with 'a <lit> ... 0'
+      assumption lines. For every assumption line it yields a Dimacs object
+      holding the clauses since the previous assumption line, and the assumed
+      literals as an int32 array. Clauses after the last assumption line are
+      yielded with None for the assumptions. """
+  dimacs_parser = DimacsParser(filename=filename, file=file, string=string, lazy=True, use_mmap=use_mmap, icnf=True)
+  return dimacs_parser.iter_queries()
+
+def validate(filename=None, file=None, string=None, use_mmap=False):
+  """ Check that DIMACS input is well-formed, raising the same errors as read()
+      would, while using memory independent of the number of clauses. Returns
+      the problem statement as a DimacsHeader. """
+  dimacs_parser = DimacsParser(filename=filename, file=file, string=string, lazy=True, use_mmap=use_mmap)
+  return dimacs_parser.validate()
+
+def read_header(filename=None, file=None, string=None):
+  """ Read only the comments and problem statement of DIMACS input and return a
+      DimacsHeader with the declared number of variables and clauses and the
+      line number of the problem statement. Compressed files are decompressed
+      only as far as the problem statement. """
+  dimacs_parser = DimacsParser(filename=filename, file=file, string=string, lazy=True)
+  return dimacs_parser.parse_header()
+
+def read(filename=None, file=None, string=None, use_mmap=False, workers=None, cache_dir=None):
+  cache = None
+  if filename is not None and cache_dir is not None:
+    cache = DimacsCache(cache_dir)
+    cached = cache.load(filename)
+    if cached is not None:
+      literals, offsets, num_vars = cached
+      return Dimacs(literals=literals, offsets=offsets, num_vars=num_vars)
+  dimacs_parser = DimacsParser(filename=filename, file=file, string=string, use_mmap=use_mmap, workers=workers)
+  dimacs = Dimacs(literals=dimacs_parser.literals, offsets=dimacs_parser.offsets)
+  if cache is not None:
+    cache.store(filename, dimacs)
+  return dimacs
+
+def read_qdimacs(filename=None, file=None, string=None, use_mmap=False, workers=None, cache_dir=None):
+  """ Read QDIMACS input, i.e. DIMACS input with 'a' and 'e' quantifier lines
+      between the problem statement and the clauses, and return a Qdimacs
+      object. Takes the same options as read(). """
+  cache = None
+  if filename is not None and cache_dir is not None:
+    cache = DimacsCache(cache_dir)
+    cached = cache.load(filename, qdimacs=True)
+    if cached is not None:
+      literals, offsets, num_vars, quantifier_types, quantifier_variables, quantifier_offsets = cached
+      return Qdimacs(literals=literals, offsets=offsets, num_vars=num_vars,
+        quantifier_types=quantifier_types.view('S1'), quantifier_variables=quantifier_variables,
+        quantifier_offsets=quantifier_offsets)
+  dimacs_parser = DimacsParser(filename=filename, file=file, string=string, use_mmap=use_mmap, workers=workers,
+    qdimacs=True)
+  qdimacs = Qdimacs(literals=dimacs_parser.literals, offsets=dimacs_parser.offsets,
+    quantifier_types=np.frombuffer(dimacs_parser.quantifier_types, dtype='S1'),
+    quantifier_variables=dimacs_parser.quantifier_variables, quantifier_offsets=dimacs_parser.quantifier_offsets)
+  if cache is not None:
+    cache.store(filename, qdimacs)
+  return qdimacs
+
+def read_wcnf(filename=None, file=None, string=None, use_mmap=False):
+  """ Read weighted (partial) MaxSAT input, either with a 'p wcnf' problem
+      statement (with or without a top weight) or in the newer format, where
+      hard clauses start with 'h' and there is no problem statement. Returns a
+      Wcnf object. """
+  dimacs_parser = DimacsParser(filename=filename, file=file, string=string, use_mmap=use_mmap, wcnf=True)
+  return Wcnf(literals=dimacs_parser.literals, offsets=dimacs_parser.offsets,
+    weights=dimacs_parser.weights, top=dimacs_parser.top)
 
 class Tests(unittest.TestCase):
 
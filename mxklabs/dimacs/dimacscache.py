@@ -0,0 +1,126 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+class DimacsCache(object):
+  """ An on-disk cache of parsed DIMACS files. Each entry holds the literal and
+      offset buffers of a mxklabs.dimacs.Dimacs object in binary form, so that a
+      cached file can be loaded by memory-mapping the entry instead of parsing
+      text.
+
+      Entries are named after the kind of entry (its magic) and the absolute
+      path of the source file, so a
+      changed source replaces its entry rather than leaving a stale one
+      behind. Entries record the size and modification time of the source and
+      a digest of its size and of some sample blocks of its content, which are
+      all checked on load. The digest catches files that were replaced without
+      their modification time changing, while keeping a warm load independent
+      of the size of the source file.
+
+      Entries of QDIMACS files also hold the quantifier prefix. """
+
+  MAGIC = b'MXKDIMC1'
+  QDIMACS_MAGIC = b'MXKQDIM1'
+  # Magic, num_vars, num_clauses, num_literals, source size, source
+  # modification time (ns), source digest.
+  HEADER = struct.Struct('<8sqqqqq32s')
+  # Number of quantifier blocks and quantified variables (QDIMACS only).
+  QDIMACS_HEADER = struct.Struct('<qq')
+  # Size and number of the sample blocks used for the source digest.
+  SAMPLE_SIZE = 1 << 16
+  NUM_SAMPLES = 16
+
+  def __init__(self, cache_dir):
+    self.cache_dir = cache_dir
+
+  def load(self, filename, qdimacs=False):
+    """ Return the cached (literals, offsets, num_vars) for filename as views
+        into the memory-mapped entry, or None if there is no valid entry. With
+        qdimacs=True, the quantifier types, variables and offsets follow. """
+    magic = self.QDIMACS_MAGIC if qdimacs else self.MAGIC
+    entry = self.__get_entry_filename(filename, magic)
+    try:
+      with open(entry, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+      return None
+    header_size = self.HEADER.size + (self.QDIMACS_HEADER.size if qdimacs else 0)
+    if len(buffer) < header_size:
+      return None
+    entry_magic, num_vars, num_clauses, num_literals, size, mtime, digest = self.HEADER.unpack_from(buffer, 0)
+    if entry_magic != magic:
+      return None
+    counts = [(np.int32, num_literals), (np.int64, num_clauses + 1)]
+    if qdimacs:
+      num_blocks, num_quantified = self.QDIMACS_HEADER.unpack_from(buffer, self.HEADER.size)
+      counts += [(np.uint8, num_blocks), (np.int32, num_quantified), (np.int64, num_blocks + 1)]
+    positions, end = self.__get_layout(header_size, counts)
+    if (size, mtime, digest) != self.__get_source_key(filename) or len(buffer) != end:
+      return None
+    # The arrays keep the memory map alive.
+    arrays = tuple(np.frombuffer(buffer, dtype=dtype, count=count, offset=pos)
+      for (dtype, count), pos in zip(counts, positions))
+    return arrays[:2] + (num_vars,) + arrays[2:]
+
+  def store(self, filename, dimacs):
+    """ Write a cache entry for a Dimacs (or Qdimacs) object parsed from
+        filename. """
+    os.makedirs(self.cache_dir, exist_ok=True)
+    arrays = [np.ascontiguousarray(dimacs.literals, dtype=np.int32),
+      np.ascontiguousarray(dimacs.offsets, dtype=np.int64)]
+    qdimacs = hasattr(dimacs, 'quantifier_offsets')
+    magic = self.QDIMACS_MAGIC if qdimacs else self.MAGIC
+    header = self.HEADER.pack(magic, dimacs.num_vars,
+      dimacs.num_clauses, len(arrays[0]), *self.__get_source_key(filename))
+    if qdimacs:
+      arrays += [np.ascontiguousarray(dimacs.quantifier_types).view(np.uint8),
+        np.ascontiguousarray(dimacs.quantifier_variables, dtype=np.int32),
+        np.ascontiguousarray(dimacs.quantifier_offsets, dtype=np.int64)]
+      header += self.QDIMACS_HEADER.pack(len(arrays[2]), len(arrays[3]))
+    positions, _ = self.__get_layout(len(header), [(array.dtype, len(array)) for array in arrays])
+    # Write to a temporary file first so readers never see a partial entry.
+    fd, temp_filename = tempfile.mkstemp(dir=self.cache_dir)
+    try:
+      with os.fdopen(fd, 'wb') as file:
+        file.write(header)
+        for array, pos in zip(arrays, positions):
+          file.write(b'\x00' * (pos - file.tell()))
+          file.write(array.data)
+      os.replace(temp_filename, self.__get_entry_filename(filename, magic))
+    except BaseException:
+      os.unlink(temp_filename)
+      raise
+
+  def __get_entry_filename(self, filename, magic):
+    # The kind of entry is part of the key, so that reading a file both as
+    # DIMACS and as QDIMACS does not make the entries evict each other.
+    key = magic + b'\x00' + os.path.abspath(filename).encode()
+    return os.path.join(self.cache_dir, hashlib.sha256(key).hexdigest() + '.dimacs')
+
+  @classmethod
+  def __get_source_key(cls, filename):
+    """ Return the size, modification time and digest of a source file. """
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+      stat = os.fstat(file.fileno())
+      size = stat.st_size
+      digest.update(struct.pack('<q', size))
+      for sample in range(cls.NUM_SAMPLES):
+        file.seek(max(0, size - cls.SAMPLE_SIZE) * sample // max(1, cls.NUM_SAMPLES - 1))
+        digest.update(file.read(cls.SAMPLE_SIZE))
+    return size, stat.st_mtime_ns, digest.digest()
+
+  @staticmethod
+  def __get_layout(pos, counts):
+    """ Return the position of each of a sequence of (dtype, count) arrays
+        written after pos, each aligned to 8 bytes, and the end position. """
+    positions = []
+    for dtype, count in counts:
+      pos = (pos + 7) & ~7
+      positions.append(pos)
+      pos += np.dtype(dtype).itemsize * count
+    return positions, pos
@@ -0,0 +1,101 @@
+import numpy as np
+
+class DimacsUtils:
+  """ Vectorized helpers for clauses in compact (literals, offsets) form. """
+
+  @staticmethod
+  def make_offsets(lengths):
+    """ Turn clause lengths into an offset array. """
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+  @staticmethod
+  def get_clause_ids(offsets):
+    """ Return the index of the clause each literal belongs to. """
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+  @staticmethod
+  def filter(literals, offsets, keep_literals=None, keep_clauses=None):
+    """ Remove literals and/or whole clauses, given boolean masks over the
+        literals and the clauses. Returns the new (literals, offsets). """
+    num_clauses = len(offsets) - 1
+    clause_ids = DimacsUtils.get_clause_ids(offsets)
+    keep = np.ones(len(literals), dtype=bool) if keep_literals is None else keep_literals.copy()
+    if keep_clauses is not None:
+      keep &= keep_clauses[clause_ids]
+    lengths = np.bincount(clause_ids[keep], minlength=num_clauses)
+    if keep_clauses is not None:
+      lengths = lengths[keep_clauses]
+    return literals[keep], DimacsUtils.make_offsets(lengths)
+
+  @staticmethod
+  def normalise(literals, offsets, sort_literals=False):
+    """ Drop duplicate literals within each clause, keeping the order of the
+        remaining literals (or sorting them by variable if sort_literals is
+        True). Returns the new (literals, offsets) and a boolean array marking
+        clauses that contain a literal and its negation. """
+    literals = np.asarray(literals)
+    clause_ids = DimacsUtils.get_clause_ids(offsets)
+    order = np.lexsort((literals, np.abs(literals), clause_ids))
+    sorted_literals = literals[order]
+    same_clause = np.zeros(len(literals), dtype=bool)
+    same_clause[1:] = clause_ids[1:] == clause_ids[:-1]
+    is_duplicate = np.zeros(len(literals), dtype=bool)
+    is_duplicate[1:] = same_clause[1:] & (sorted_literals[1:] == sorted_literals[:-1])
+    is_complement = np.zeros(len(literals), dtype=bool)
+    is_complement[1:] = same_clause[1:] & (sorted_literals[1:] == -sorted_literals[:-1])
+    # Sorting keeps the literals of each clause together, so the clause ids
+    # still apply.
+    is_tautology = DimacsUtils.any_per_clause(is_complement, offsets)
+    if sort_literals:
+      literals = sorted_literals
+    else:
+      # Map the flags back to the original literal positions.
+      flags = np.empty_like(is_duplicate)
+      flags[order] = is_duplicate
+      is_duplicate = flags
+    literals, offsets = DimacsUtils.filter(literals, offsets, keep_literals=~is_duplicate)
+    return literals, offsets, is_tautology
+
+  @staticmethod
+  def any_per_clause(values, offsets):
+    """ For a boolean value per literal, return whether any literal of each
+        clause has a true value (False for empty clauses). """
+    counts = np.bincount(DimacsUtils.get_clause_ids(offsets), weights=values, minlength=len(offsets) - 1)
+    return counts > 0
+
+  @staticmethod
+  def hash_literals(literals):
+    """ Map literals to well-mixed 64-bit values (the splitmix64 finaliser). """
+    x = literals.astype(np.int64).view(np.uint64) + np.uint64(0x9e3779b97f4a7c15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+  @staticmethod
+  def get_clause_hashes(literals, offsets):
+    """ Return a 64-bit hash per clause that does not depend on the order of
+        its literals: the mixed sum of the literal hashes and the length. """
+    sums = np.zeros(len(literals) + 1, dtype=np.uint64)
+    np.cumsum(DimacsUtils.hash_literals(np.asarray(literals)), out=sums[1:])
+    offsets = np.asarray(offsets)
+    clause_sums = sums[offsets[1:]] - sums[offsets[:-1]] + np.diff(offsets).astype(np.uint64)
+    return DimacsUtils.hash_literals(clause_sums.view(np.int64))
+
+  @staticmethod
+  def get_assignment(model, num_vars):
+    """ Convert a model to a boolean array indexed by variable (entry 0 is
+        unused). The model is either such an array or a list of signed
+        literals as returned by pysat. A 2-D boolean array is a batch of
+        models, one per row, and is converted row by row. """
+    if isinstance(model, np.ndarray) and model.dtype == bool:
+      assignment = np.zeros(model.shape[:-1] + (num_vars + 1,), dtype=bool)
+      size = min(model.shape[-1], num_vars + 1)
+      assignment[..., :size] = model[..., :size]
+      return assignment
+    literals = np.asarray(model, dtype=np.int64)
+    literals = literals[np.abs(literals) <= num_vars]
+    assignment = np.zeros(num_vars + 1, dtype=bool)
+    assignment[np.abs(literals)] = literals > 0
+    return assignment
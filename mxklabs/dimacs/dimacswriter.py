@@ -0,0 +1,224 @@
+import io
+
+import numpy as np
+
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+_SPACE_BYTE = ord(' ')
+_NEWLINE_BYTE = ord('\n')
+_MINUS_BYTE = ord('-')
+_ZERO_BYTE = ord('0')
+_HARD_BYTE = ord('h')
+
+# Width of the numbers in a problem statement that is filled in on close.
+_HEADER_FIELD_WIDTH = 20
+
+def format_clauses(literals, offsets, weights=None, is_hard=None):
+  """ Format the clauses literals[offsets[i]-offsets[0]:offsets[i+1]-offsets[0]]
+      as DIMACS clause lines. All numbers are converted to text with a fixed
+      number of vectorized passes rather than one format call per literal. If
+      weights are given, each line starts with the clause's weight, or with
+      'h' for clauses marked in is_hard (WCNF). """
+  literals = np.asarray(literals, dtype=np.int64)
+  offsets = np.asarray(offsets, dtype=np.int64)
+  num_clauses = len(offsets) - 1
+  if num_clauses <= 0:
+    return b''
+
+  # Interleave the literals with the weights and the terminating zeros.
+  tokens_per_clause = 1 if weights is None else 2
+  clause_starts = offsets[:-1] - offsets[0] + tokens_per_clause * np.arange(num_clauses)
+  zero_positions = offsets[1:] - offsets[0] + tokens_per_clause * np.arange(1, num_clauses + 1) - 1
+  is_literal = np.ones(len(literals) + tokens_per_clause * num_clauses, dtype=bool)
+  is_literal[zero_positions] = False
+  if weights is not None:
+    is_literal[clause_starts] = False
+  tokens = np.zeros(len(is_literal), dtype=np.int64)
+  tokens[is_literal] = literals
+  if weights is not None:
+    tokens[clause_starts] = weights
+    if is_hard is not None:
+      tokens[clause_starts[is_hard]] = 0
+
+  values = np.abs(tokens)
+  is_negative = tokens < 0
+  num_digits = np.ones(len(tokens), dtype=np.int64)
+  max_value = values.max()
+  for power in _POWERS_OF_TEN[1:]:
+    if power > max_value:
+      break
+    num_digits += values >= power
+  # Every token is followed by a space or, for the zeros, a newline.
+  token_ends = np.cumsum(num_digits + is_negative + 1)
+
+  text = np.empty(token_ends[-1], dtype=np.uint8)
+  text[token_ends - 1] = _SPACE_BYTE
+  text[token_ends[zero_positions] - 1] = _NEWLINE_BYTE
+  text[(token_ends - num_digits - is_negative - 1)[is_negative]] = _MINUS_BYTE
+  for digit in range(int(num_digits.max())):
+    active = np.flatnonzero(num_digits > digit)
+    text[token_ends[active] - 2 - digit] = _ZERO_BYTE + (values[active] // _POWERS_OF_TEN[digit]) % 10
+  if weights is not None and is_hard is not None:
+    text[token_ends[clause_starts[is_hard]] - 2] = _HARD_BYTE
+  return text.tobytes()
+
+def _split_blocks(offsets, size):
+  """ Yield (start, end) ranges of clauses holding about size literals each. """
+  start = 0
+  while start < len(offsets) - 1:
+    end = int(np.searchsorted(offsets, offsets[start] + size, side='right')) - 1
+    end = min(max(end, start + 1), len(offsets) - 1)
+    yield start, end
+    start = end
+
+class DimacsWriter(object):
+  """ Write clauses to a DIMACS file. Clauses are collected and written in large
+      blocks. If the number of variables or clauses is not known up front, the
+      problem statement is filled in when the writer is closed, which requires a
+      seekable file. Empty clauses cannot be written. """
+
+  # Number of literals collected before they are formatted and written.
+  BUFFER_SIZE = 1 << 20
+
+  def __init__(self, file, num_vars=None, num_clauses=None, comments=None):
+    if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+      self.file = open(file, 'wb')
+      self.owns_file = True
+    else:
+      self.file = file
+      self.owns_file = False
+    self.is_text = isinstance(self.file, io.TextIOBase)
+    self.declared_num_vars = num_vars
+    self.declared_num_clauses = num_clauses
+    self.num_vars = 0
+    self.num_clauses = 0
+    self.pending_literals = []
+    self.pending_lengths = []
+
+    for comment in comments or []:
+      self.__write(("c %s\n" % comment).encode())
+    self.header_pos = self.file.tell() if self.__has_header_placeholder() else None
+    if self.header_pos is None:
+      self.__write(b"p cnf %d %d\n" % (num_vars, num_clauses))
+    else:
+      self.__write(self.__format_header(0, 0))
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if exc_type is None:
+      self.close()
+    elif self.owns_file:
+      self.file.close()
+
+  def write_clause(self, clause):
+    """ Write a single clause (a sequence of non-zero ints). """
+    if len(clause) == 0:
+      self.__raise_empty_clause(self.num_clauses + len(self.pending_lengths))
+    self.pending_literals.extend(clause)
+    self.pending_lengths.append(len(clause))
+    if len(self.pending_literals) >= self.BUFFER_SIZE:
+      self.flush()
+
+  def write_clauses(self, clauses):
+    """ Write every clause in an iterable of clauses. """
+    for clause in clauses:
+      self.write_clause(clause)
+
+  def write_block(self, literals, offsets):
+    """ Write clauses held in compact form (see mxklabs.dimacs.Dimacs). """
+    self.flush()
+    offsets = np.asarray(offsets, dtype=np.int64)
+    for start, end in _split_blocks(offsets, self.BUFFER_SIZE):
+      self.__write_compact(literals[offsets[start]:offsets[end]], offsets[start:end + 1])
+
+  def flush(self):
+    if len(self.pending_lengths) > 0:
+      offsets = np.zeros(len(self.pending_lengths) + 1, dtype=np.int64)
+      np.cumsum(self.pending_lengths, out=offsets[1:])
+      self.__write_compact(np.array(self.pending_literals, dtype=np.int64), offsets)
+      self.pending_literals = []
+      self.pending_lengths = []
+
+  def close(self):
+    """ Write outstanding clauses, fill in the problem statement if needed and
+        check it against what was written. """
+    self.flush()
+    if self.header_pos is not None:
+      end_pos = self.file.tell()
+      self.file.seek(self.header_pos)
+      self.__write(self.__format_header(
+        self.num_vars if self.declared_num_vars is None else self.declared_num_vars,
+        self.num_clauses if self.declared_num_clauses is None else self.declared_num_clauses))
+      self.file.seek(end_pos)
+    if self.owns_file:
+      self.file.close()
+    else:
+      self.file.flush()
+
+    if self.declared_num_vars is not None and self.declared_num_vars < self.num_vars:
+      raise Exception("error: the declared number of variables (%d) is smaller than the actual number of variables (%d)" % (
+        self.declared_num_vars, self.num_vars))
+    if self.declared_num_clauses is not None and self.declared_num_clauses != self.num_clauses:
+      raise Exception("error: the declared number of clauses (%d) does not match the actual number of clauses (%d)" % (
+        self.declared_num_clauses, self.num_clauses))
+
+  def __has_header_placeholder(self):
+    return self.declared_num_vars is None or self.declared_num_clauses is None
+
+  def __write_compact(self, literals, offsets):
+    is_empty = offsets[1:] == offsets[:-1]
+    if np.any(is_empty):
+      self.__raise_empty_clause(self.num_clauses + int(np.argmax(is_empty)))
+    if len(literals) > 0:
+      self.num_vars = max(self.num_vars, int(np.abs(literals).max()))
+    self.num_clauses += len(offsets) - 1
+    self.__write(format_clauses(literals, offsets))
+
+  @staticmethod
+  def __raise_empty_clause(index):
+    raise Exception("error: cannot write clause %d as it is empty (a line holding only '0' is not read as a clause)" % index)
+
+  def __write(self, data):
+    self.file.write(data.decode('ascii') if self.is_text else data)
+
+  @staticmethod
+  def __format_header(num_vars, num_clauses):
+    return b"p cnf %s %s\n" % (
+      str(num_vars).encode().ljust(_HEADER_FIELD_WIDTH),
+      str(num_clauses).encode().ljust(_HEADER_FIELD_WIDTH))
+
+def write(dimacs, file, comments=None):
+  """ Write a mxklabs.dimacs.Dimacs object to a filename or file object. """
+  with DimacsWriter(file, num_vars=dimacs.num_vars, num_clauses=dimacs.num_clauses, comments=comments) as writer:
+    writer.write_block(dimacs.literals, dimacs.offsets)
+
+def write_wcnf(wcnf, file, comments=None, legacy=False):
+  """ Write a mxklabs.dimacs.Wcnf object to a filename or file object. By
+      default the newer WCNF format is written, where hard clauses start with
+      'h' and there is no problem statement. With legacy=True, a 'p wcnf'
+      problem statement with the top weight is written and hard clauses are
+      given the top weight. """
+  owns_file = isinstance(file, (str, bytes)) or hasattr(file, '__fspath__')
+  if owns_file:
+    file = open(file, 'wb')
+  is_text = isinstance(file, io.TextIOBase)
+  try:
+    chunks = [("c %s\n" % comment).encode() for comment in comments or []]
+    if legacy:
+      chunks.append(b"p wcnf %d %d %d\n" % (wcnf.num_vars, wcnf.num_clauses, wcnf.top))
+    is_hard = None if legacy else wcnf.is_hard()
+    for start, end in _split_blocks(wcnf.offsets, DimacsWriter.BUFFER_SIZE):
+      chunks.append(format_clauses(wcnf.literals[wcnf.offsets[start]:wcnf.offsets[end]], wcnf.offsets[start:end + 1],
+        wcnf.weights[start:end], None if is_hard is None else is_hard[start:end]))
+      data = b''.join(chunks)
+      file.write(data.decode('ascii') if is_text else data)
+      chunks = []
+    if chunks:
+      data = b''.join(chunks)
+      file.write(data.decode('ascii') if is_text else data)
+  finally:
+    if owns_file:
+      file.close()
+    else:
+      file.flush()
@@ -0,0 +1,124 @@
+import collections
+import heapq
+
+import numpy as np
+
+from .dimacs import Dimacs
+from .dimacsutils import DimacsUtils
+from .modelreconstructor import ModelReconstructor
+
+class VariableEliminator(object):
+  """ Bounded variable elimination (as in SatELite). A variable x is eliminated
+      by replacing all clauses that contain x or -x with their non-tautological
+      resolvents on x, which gives an equisatisfiable formula without x. This
+      is only done if it adds at most bound clauses to the formula.
+
+      Variables are tried in order of increasing (occurrences of x) *
+      (occurrences of -x) and variables whose clauses change are tried again.
+      Every literal visited while resolving counts as a step and elimination
+      stops when max_steps is reached. The removed clauses are pushed onto a
+      ModelReconstructor, which restores the eliminated variables in models. """
+
+  def __init__(self, dimacs, bound=0, max_steps=10**8):
+    self.num_vars = dimacs.num_vars
+    self.bound = bound
+    self.max_steps = max_steps
+    self.steps = 0
+    self.reconstructor = ModelReconstructor(self.num_vars)
+    self.is_unsat = bool(np.any(np.diff(dimacs.offsets) == 0))
+
+    # Clauses as tuples (None once removed), with occurrence sets per literal
+    # taken from the occurrence index of the input. Normalisation keeps the
+    # clause indices, so they apply here too.
+    literals, offsets, is_tautology = DimacsUtils.normalise(dimacs.literals, dimacs.offsets)
+    literals = literals.tolist()
+    offsets = offsets.tolist()
+    self.clauses = [tuple(literals[start:end]) for start, end in zip(offsets[:-1], offsets[1:])]
+    occurrence_index = dimacs.occurrence_index()
+    self.occurrences = collections.defaultdict(set)
+    for variable in np.flatnonzero(occurrence_index.counts.sum(axis=1)).tolist():
+      self.occurrences[variable] = set(occurrence_index.get_clauses(variable).tolist())
+      self.occurrences[-variable] = set(occurrence_index.get_clauses(-variable).tolist())
+    for index in np.flatnonzero(is_tautology).tolist():
+      self.__remove(index)
+    self.eliminated = np.zeros(self.num_vars + 1, dtype=bool)
+
+  def run(self):
+    """ Returns the simplified formula and a ModelReconstructor for it. If the
+        formula is found to be unsatisfiable, the simplified formula is the
+        trivially unsatisfiable formula [[1], [-1]]. """
+    queue = [(self.__get_score(variable), variable) for variable in range(1, self.num_vars + 1)]
+    heapq.heapify(queue)
+    while queue and not self.is_unsat and self.steps < self.max_steps:
+      score, variable = heapq.heappop(queue)
+      if self.eliminated[variable]:
+        continue
+      if score != self.__get_score(variable):
+        heapq.heappush(queue, (self.__get_score(variable), variable))
+        continue
+      for touched in self.__try_eliminate(variable):
+        heapq.heappush(queue, (self.__get_score(touched), touched))
+    if self.is_unsat:
+      return Dimacs([[1], [-1]]), self.reconstructor
+    return Dimacs([list(clause) for clause in self.clauses if clause is not None]), self.reconstructor
+
+  def __get_score(self, variable):
+    return len(self.occurrences[variable]) * len(self.occurrences[-variable])
+
+  def __try_eliminate(self, variable):
+    """ Eliminate a variable if that is within the bound. Returns the variables
+        whose occurrences changed. """
+    positive = [self.clauses[index] for index in self.occurrences[variable]]
+    negative = [self.clauses[index] for index in self.occurrences[-variable]]
+    resolvents = self.__get_resolvents(variable, positive, negative, len(positive) + len(negative) + self.bound)
+    if resolvents is None:
+      return []
+    self.eliminated[variable] = True
+    removed = positive + negative
+    witnesses = [variable] * len(positive) + [-variable] * len(negative)
+    self.reconstructor.push_clauses(witnesses, [literal for clause in removed for literal in clause],
+      DimacsUtils.make_offsets([len(clause) for clause in removed]))
+    for index in list(self.occurrences[variable] | self.occurrences[-variable]):
+      self.__remove(index)
+    for resolvent in resolvents:
+      self.__add(resolvent)
+    return set(abs(literal) for clause in removed + resolvents for literal in clause) - {variable}
+
+  def __get_resolvents(self, variable, positive, negative, limit):
+    """ Returns the non-tautological resolvents of the positive and negative
+        clauses on variable, or None if there are more than limit of them or
+        the step budget runs out. """
+    resolvents = []
+    negative_rests = [[literal for literal in other if literal != -variable] for other in negative]
+    negative_sets = [set(other) for other in negative]
+    for clause in positive:
+      rest = [literal for literal in clause if literal != variable]
+      for other_rest, other_set in zip(negative_rests, negative_sets):
+        self.steps += len(rest) + len(other_rest) + 2
+        if self.steps >= self.max_steps:
+          return None
+        if any(-literal in other_set for literal in rest):
+          continue
+        resolvents.append(tuple(dict.fromkeys(rest + other_rest)))
+        if len(resolvents) > limit:
+          return None
+    return resolvents
+
+  def __remove(self, index):
+    for literal in self.clauses[index]:
+      self.occurrences[literal].discard(index)
+    self.clauses[index] = None
+
+  def __add(self, clause):
+    if len(clause) == 0:
+      self.is_unsat = True
+    index = len(self.clauses)
+    self.clauses.append(clause)
+    for literal in clause:
+      self.occurrences[literal].add(index)
+
+def eliminate_variables(dimacs, bound=0, max_steps=10**8):
+  """ Simplify a mxklabs.dimacs.Dimacs object with a VariableEliminator.
+      Returns the simplified formula and a ModelReconstructor that extends its
+      models to models of the original formula. """
+  return VariableEliminator(dimacs, bound=bound, max_steps=max_steps).run()
@@ -0,0 +1,72 @@
+import numpy as np
+
+from .dimacswriter import DimacsWriter
+
+# Number of clauses generated per block.
+CLAUSE_BLOCK_SIZE = 1 << 18
+
+# Clauses are drawn by ranking random keys over all variables if the number
+# of variables is at most this many times the clause length.
+DENSE_FACTOR = 4
+
+# Number of random keys drawn at a time for such clauses.
+KEY_BUFFER_SIZE = 1 << 22
+
+# Clause/variable ratio used when no number of clauses is given (the
+# satisfiability threshold of random 3-SAT).
+DEFAULT_RATIO = 4.26
+
+def _sample_variables(rng, num_vars, count, k):
+  """ Draw count rows of k distinct variables out of 1..num_vars. """
+  if DENSE_FACTOR * k >= num_vars:
+    # Take the positions of the k smallest of num_vars random keys per row, a
+    # bounded number of rows at a time.
+    num_rows = max(1, KEY_BUFFER_SIZE // num_vars)
+    return np.concatenate([
+      np.argpartition(rng.random((min(num_rows, count - start), num_vars)), k - 1, axis=1)[:, :k]
+      for start in range(0, count, num_rows)]).astype(np.int32) + 1
+  variables = rng.integers(1, num_vars + 1, size=(count, k), dtype=np.int32)
+  # Redraw only the repeated variables until every row is distinct. With k
+  # small relative to num_vars, this takes few rounds.
+  while True:
+    order = np.argsort(variables, axis=1)
+    ordered = np.take_along_axis(variables, order, axis=1)
+    rows, columns = np.nonzero(ordered[:, 1:] == ordered[:, :-1])
+    if len(rows) == 0:
+      return variables
+    variables[rows, order[rows, columns + 1]] = rng.integers(1, num_vars + 1, size=len(rows), dtype=np.int32)
+
+def iter_random_ksat(num_vars, num_clauses=None, k=3, seed=0, ratio=DEFAULT_RATIO, block_size=None):
+  """ Generate a uniform random k-SAT formula block by block. Every clause has
+      k distinct variables, each negated with probability 1/2. If num_clauses
+      is None, it is round(ratio * num_vars). Yields (literals, offsets) pairs
+      in compact form (see mxklabs.dimacs.Dimacs) of up to block_size clauses
+      (CLAUSE_BLOCK_SIZE by default). The formula is determined by the
+      arguments, including the block size. """
+  if k < 1 or num_vars < k:
+    raise Exception("error: cannot pick %d distinct variables out of %d" % (k, num_vars))
+  if num_vars > np.iinfo(np.int32).max:
+    raise Exception("error: number of variables out of range (%d)" % num_vars)
+  if num_clauses is None:
+    num_clauses = int(round(ratio * num_vars))
+  if block_size is None:
+    block_size = CLAUSE_BLOCK_SIZE
+  rng = np.random.Generator(np.random.PCG64(seed))
+  for start in range(0, num_clauses, block_size):
+    count = min(block_size, num_clauses - start)
+    variables = _sample_variables(rng, num_vars, count, k)
+    is_negated = rng.integers(0, 2, size=(count, k), dtype=np.uint8).astype(bool)
+    np.negative(variables, out=variables, where=is_negated)
+    yield variables.reshape(-1), np.arange(0, k * count + 1, k, dtype=np.int64)
+
+def write_random_ksat(file, num_vars, num_clauses=None, k=3, seed=0, ratio=DEFAULT_RATIO, comments=None):
+  """ Write a uniform random k-SAT formula (see iter_random_ksat) to a
+      filename or file object. The clauses are written block by block through a
+      DimacsWriter, so the formula is never held in memory as a whole. Returns
+      the number of clauses written. """
+  if num_clauses is None:
+    num_clauses = int(round(ratio * num_vars))
+  with DimacsWriter(file, num_vars=num_vars, num_clauses=num_clauses, comments=comments) as writer:
+    for literals, offsets in iter_random_ksat(num_vars, num_clauses=num_clauses, k=k, seed=seed):
+      writer.write_block(literals, offsets)
+  return num_clauses
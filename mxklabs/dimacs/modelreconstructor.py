@@ -0,0 +1,42 @@
+import numpy as np
+
+from .dimacsutils import DimacsUtils
+
+class ModelReconstructor(object):
+  """ Extends models of a simplified formula to models of the original formula.
+
+      Simplifications that are not equivalence-preserving push (witness, clause)
+      entries onto a stack. To extend a model, the stack is processed in reverse
+      and whenever the model falsifies an entry's clause, the entry's witness
+      literal is made true. Units and pure literals are entries whose clause is
+      just the witness; they are stored in blocks and applied in one go. """
+
+  def __init__(self, num_vars):
+    self.num_vars = num_vars
+    self.blocks = []
+
+  def push_units(self, literals):
+    """ Push literals that must be true in any extended model. """
+    if len(literals) > 0:
+      self.blocks.append((np.array(literals, dtype=np.int64), None, None))
+
+  def push_clauses(self, witnesses, literals, offsets):
+    """ Push clauses in compact form, with one witness literal per clause. """
+    if len(witnesses) > 0:
+      self.blocks.append((np.array(witnesses, dtype=np.int64),
+        np.array(literals, dtype=np.int64), np.array(offsets, dtype=np.int64)))
+
+  def extend(self, model):
+    """ Extend a model of the simplified formula (a boolean array indexed by
+        variable or a list of signed literals) to a boolean array of length
+        num_vars+1 that satisfies the original formula. """
+    assignment = DimacsUtils.get_assignment(model, self.num_vars)
+    for witnesses, literals, offsets in reversed(self.blocks):
+      if literals is None:
+        assignment[np.abs(witnesses)] = witnesses > 0
+      else:
+        for index in reversed(range(len(witnesses))):
+          clause = literals[offsets[index]:offsets[index + 1]]
+          if not np.any(assignment[np.abs(clause)] == (clause > 0)):
+            assignment[abs(witnesses[index])] = witnesses[index] > 0
+    return assignment
@@ -0,0 +1,54 @@
+import numpy as np
+
+from .dimacsutils import DimacsUtils
+
+class OccurrenceIndex(object):
+  """ For every literal, the (sorted) indices of the clauses that contain it.
+
+      The index is held in compressed sparse row form. Literal l has key
+      2*abs(l) for positive and 2*abs(l)+1 for negative literals, and the
+      clauses containing it are clause_ids[offsets[key]:offsets[key+1]]. As
+      both literals of a variable have adjacent keys, the clauses containing a
+      variable are a single slice too. Lookups return read-only views.
+
+      The occurrence counts are computed up front. The clause indices are
+      sorted into place on the first lookup. """
+
+  def __init__(self, literals, offsets, num_vars):
+    self.literals = np.asarray(literals)
+    self.clause_offsets = np.asarray(offsets)
+    self.num_vars = num_vars
+    self.keys = 2 * np.abs(self.literals.astype(np.int64)) + (self.literals < 0)
+    counts = np.bincount(self.keys, minlength=2 * (num_vars + 1))
+    self.offsets = DimacsUtils.make_offsets(counts)
+    self.offsets.flags.writeable = False
+    self.counts = counts.reshape(-1, 2)
+    self.counts.flags.writeable = False
+    self.clause_ids = None
+
+  def get_clauses(self, literal):
+    """ Return the indices of the clauses that contain literal. """
+    key = 2 * abs(literal) + (literal < 0)
+    return self.get_clause_ids()[self.offsets[key]:self.offsets[key + 1]]
+
+  def get_variable_clauses(self, variable):
+    """ Return the indices of the clauses that contain variable (positive
+        occurrences first, then negative occurrences). """
+    return self.get_clause_ids()[self.offsets[2 * variable]:self.offsets[2 * variable + 2]]
+
+  def get_positive_counts(self):
+    """ Return the number of positive occurrences of each variable. """
+    return self.counts[:, 0]
+
+  def get_negative_counts(self):
+    """ Return the number of negative occurrences of each variable. """
+    return self.counts[:, 1]
+
+  def get_clause_ids(self):
+    """ Return the clause indices of all literals, ordered by key. """
+    if self.clause_ids is None:
+      order = np.argsort(self.keys, kind='stable')
+      self.clause_ids = DimacsUtils.get_clause_ids(self.clause_offsets)[order]
+      self.clause_ids.flags.writeable = False
+      self.keys = None
+    return self.clause_ids
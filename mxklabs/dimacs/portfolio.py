@@ -0,0 +1,113 @@
+import multiprocessing
+import multiprocessing.shared_memory
+import queue
+import time
+
+import numpy as np
+
+from .dimacsutils import DimacsUtils
+
+# Solvers used by solve_portfolio when none are given (pysat solver names).
+DEFAULT_SOLVERS = ('cadical153', 'glucose4', 'maplesat')
+
+# Seconds between checks for solver processes that exited without a result.
+POLL_INTERVAL = 0.1
+
+class PortfolioResult(object):
+  """ The outcome of solve_portfolio. The result is True if the formula is
+      satisfiable, False if it is unsatisfiable and None if no solver
+      finished in time. For satisfiable formulas, model is a boolean array
+      indexed by variable. """
+
+  def __init__(self, result=None, solver=None, model=None, elapsed=None):
+    self.result = result
+    self.solver = solver
+    self.model = model
+    self.elapsed = elapsed
+
+  def __bool__(self):
+    return self.result is True
+
+def _run_solver(index, solver_name, memory_name, num_literals, num_clauses, num_vars, results):
+  """ Solve the formula held in shared memory with one pysat solver (in a
+      worker process) and put (index, result, model, error) on the results
+      queue. """
+  try:
+    # pysat is only needed by the workers.
+    import pysat.solvers
+    memory = multiprocessing.shared_memory.SharedMemory(name=memory_name)
+    try:
+      literals = np.ndarray(num_literals, dtype=np.int32, buffer=memory.buf)
+      offsets = np.ndarray(num_clauses + 1, dtype=np.int64, buffer=memory.buf, offset=literals.nbytes)
+      with pysat.solvers.Solver(name=solver_name) as solver:
+        literal_list = literals.tolist()
+        offset_list = offsets.tolist()
+        solver.append_formula([literal_list[start:end] for start, end in zip(offset_list[:-1], offset_list[1:])])
+        del literals, offsets
+        result = solver.solve()
+        model = DimacsUtils.get_assignment(solver.get_model(), num_vars) if result else None
+    finally:
+      memory.close()
+    results.put((index, result, model, None))
+  except Exception as e:
+    results.put((index, None, None, "%s(%s)" % (type(e).__name__, e)))
+
+def solve_portfolio(dimacs, solvers=DEFAULT_SOLVERS, timeout=None):
+  """ Run several pysat solvers on a mxklabs.dimacs.Dimacs object, each in its
+      own process, and return a PortfolioResult with the first answer. The
+      other solvers are then terminated. The literal and offset buffers are
+      passed to the workers in shared memory rather than being pickled for
+      each of them. If timeout (in seconds) expires first, all solvers are
+      terminated and the result is None. Solvers that raise an error or exit
+      without a result count as failed. """
+  start_time = time.monotonic()
+  solvers = list(solvers)
+  literals = np.ascontiguousarray(dimacs.literals, dtype=np.int32)
+  offsets = np.ascontiguousarray(dimacs.offsets, dtype=np.int64)
+  memory = multiprocessing.shared_memory.SharedMemory(create=True, size=max(1, literals.nbytes + offsets.nbytes))
+  processes = []
+  try:
+    memory.buf[:literals.nbytes] = literals.view(np.uint8)
+    memory.buf[literals.nbytes:literals.nbytes + offsets.nbytes] = offsets.view(np.uint8)
+    results = multiprocessing.Queue()
+    for index, solver_name in enumerate(solvers):
+      process = multiprocessing.Process(target=_run_solver, args=(index, solver_name, memory.name,
+        len(literals), dimacs.num_clauses, dimacs.num_vars, results), daemon=True)
+      process.start()
+      processes.append(process)
+
+    finished = set()
+    errors = []
+    while len(finished) < len(processes):
+      remaining = None if timeout is None else timeout - (time.monotonic() - start_time)
+      if remaining is not None and remaining <= 0:
+        break
+      try:
+        message = results.get(timeout=POLL_INTERVAL if remaining is None else min(POLL_INTERVAL, remaining))
+      except queue.Empty:
+        exited = [index for index, process in enumerate(processes)
+          if index not in finished and process.exitcode is not None]
+        # A process that exited has flushed its result (if any) to the queue.
+        try:
+          message = results.get(block=False)
+        except queue.Empty:
+          for index in exited:
+            finished.add(index)
+            errors.append("%s: exited with code %d without a result" % (solvers[index], processes[index].exitcode))
+          continue
+      index, result, model, error = message
+      finished.add(index)
+      if error is None:
+        return PortfolioResult(result=result, solver=solvers[index], model=model, elapsed=time.monotonic() - start_time)
+      errors.append("%s: %s" % (solvers[index], error))
+    if errors and len(errors) == len(processes):
+      raise Exception("error: all solvers failed (%s)" % "; ".join(errors))
+    return PortfolioResult(elapsed=time.monotonic() - start_time)
+  finally:
+    for process in processes:
+      if process.is_alive():
+        process.terminate()
+    for process in processes:
+      process.join()
+    memory.close()
+    memory.unlink()
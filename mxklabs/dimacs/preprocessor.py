@@ -0,0 +1,123 @@
+import numpy as np
+
+from .dimacs import Dimacs
+from .dimacsutils import DimacsUtils
+from .modelreconstructor import ModelReconstructor
+from .occurrenceindex import OccurrenceIndex
+
+class Preprocessor(object):
+  """ Simplifies a CNF formula into a smaller, equisatisfiable one by removing
+      duplicate literals, tautological clauses and duplicate clauses, and by
+      applying unit propagation and pure literal elimination until neither
+      changes anything. Each step is a vectorized pass over the literal buffer.
+
+      Variables keep their numbers. Variables that are assigned along the way
+      are recorded in a ModelReconstructor. """
+
+  def __init__(self, dimacs):
+    self.num_vars = dimacs.num_vars
+    self.literals = np.array(dimacs.literals, dtype=np.int32)
+    self.offsets = np.array(dimacs.offsets, dtype=np.int64)
+    # Per variable: 1 if assigned true, -1 if assigned false, 0 otherwise.
+    self.assignment = np.zeros(self.num_vars + 1, dtype=np.int8)
+    self.reconstructor = ModelReconstructor(self.num_vars)
+    self.is_unsat = False
+
+  def run(self):
+    """ Returns the simplified formula and a ModelReconstructor for it. If the
+        formula is found to be unsatisfiable, the simplified formula is the
+        trivially unsatisfiable formula [[1], [-1]]. """
+    self.__check_empty_clauses()
+    if not self.is_unsat:
+      self.__normalise_clauses()
+    changed = True
+    while changed and not self.is_unsat:
+      changed = self.__propagate_units()
+      if not self.is_unsat:
+        changed = self.__eliminate_pure_literals() or changed
+    if self.is_unsat:
+      return Dimacs([[1], [-1]]), self.reconstructor
+    self.__remove_duplicate_clauses()
+    return Dimacs(literals=self.literals, offsets=self.offsets), self.reconstructor
+
+  def __check_empty_clauses(self):
+    if np.any(np.diff(self.offsets) == 0):
+      self.is_unsat = True
+
+  def __normalise_clauses(self):
+    """ Sort the literals in each clause by variable, drop duplicate literals
+        and drop clauses that contain both a literal and its negation. """
+    literals, offsets, is_tautology = DimacsUtils.normalise(self.literals, self.offsets, sort_literals=True)
+    self.literals, self.offsets = DimacsUtils.filter(literals, offsets, keep_clauses=~is_tautology)
+
+  def __propagate_units(self):
+    """ Assign all unit clauses and simplify the formula, until no unit
+        clauses are left. Returns whether anything was assigned. """
+    changed = False
+    while not self.is_unsat:
+      units = self.literals[self.offsets[:-1][np.diff(self.offsets) == 1]]
+      if len(units) == 0:
+        break
+      units = np.unique(units)
+      if len(np.unique(np.abs(units))) != len(units):
+        self.is_unsat = True
+        break
+      self.__assign(units)
+      changed = True
+    return changed
+
+  def __eliminate_pure_literals(self):
+    """ Assign every literal whose negation does not occur. Returns whether
+        anything was assigned. """
+    occurrence_index = OccurrenceIndex(self.literals, self.offsets, self.num_vars)
+    positive_counts = occurrence_index.get_positive_counts()
+    negative_counts = occurrence_index.get_negative_counts()
+    positive = (positive_counts > 0) & (negative_counts == 0)
+    negative = (negative_counts > 0) & (positive_counts == 0)
+    pure = np.concatenate((np.flatnonzero(positive), -np.flatnonzero(negative)))
+    if len(pure) == 0:
+      return False
+    self.__assign(pure)
+    return True
+
+  def __assign(self, literals):
+    """ Make the given literals true and simplify the formula accordingly. """
+    self.assignment[np.abs(literals)] = np.sign(literals)
+    self.reconstructor.push_units(literals)
+    values = self.assignment[np.abs(self.literals)] * np.sign(self.literals).astype(np.int8)
+    is_satisfied = DimacsUtils.any_per_clause(values == 1, self.offsets)
+    self.literals, self.offsets = DimacsUtils.filter(self.literals, self.offsets,
+      keep_literals=values == 0, keep_clauses=~is_satisfied)
+    if np.any(np.diff(self.offsets) == 0):
+      self.is_unsat = True
+
+  def __remove_duplicate_clauses(self):
+    """ Remove clauses that are identical to an earlier one. Clauses are sorted
+        by length and an order-independent hash, and neighbouring clauses with
+        the same key are compared literal by literal. """
+    num_clauses = len(self.offsets) - 1
+    if num_clauses < 2:
+      return
+    lengths = np.diff(self.offsets)
+    hashes = np.add.reduceat(DimacsUtils.hash_literals(self.literals), self.offsets[:-1])
+    order = np.lexsort((hashes, lengths))
+    first, second = order[:-1], order[1:]
+    candidates = (lengths[first] == lengths[second]) & (hashes[first] == hashes[second])
+    first, second = first[candidates], second[candidates]
+    if len(first) == 0:
+      return
+    pair_lengths = lengths[first]
+    pair_offsets = DimacsUtils.make_offsets(pair_lengths)
+    positions = np.arange(pair_offsets[-1]) - np.repeat(pair_offsets[:-1], pair_lengths)
+    is_equal = self.literals[np.repeat(self.offsets[first], pair_lengths) + positions] == \
+      self.literals[np.repeat(self.offsets[second], pair_lengths) + positions]
+    is_different = DimacsUtils.any_per_clause(~is_equal, pair_offsets)
+    is_duplicate = np.zeros(num_clauses, dtype=bool)
+    is_duplicate[second[~is_different]] = True
+    self.literals, self.offsets = DimacsUtils.filter(self.literals, self.offsets, keep_clauses=~is_duplicate)
+
+def preprocess(dimacs):
+  """ Simplify a mxklabs.dimacs.Dimacs object with a Preprocessor. Returns the
+      simplified formula and a ModelReconstructor that extends its models to
+      models of the original formula. """
+  return Preprocessor(dimacs).run()
@@ -0,0 +1,198 @@
+import collections
+
+import numpy as np
+
+from .dimacs import Dimacs
+from .dimacsutils import DimacsUtils
+
+class Subsumer(object):
+  """ Removes subsumed clauses and strengthens clauses by self-subsuming
+      resolution, producing an equivalent formula.
+
+      A clause C subsumes a clause D if C is a subset of D, in which case D is
+      redundant. If C is a subset of D except for one literal l whose negation
+      is in D, then D can be strengthened by removing -l from it. Candidates
+      are found through per-variable occurrence lists and most are ruled out
+      with 64-bit clause signatures (a bloom filter of the clause's variables)
+      before the clauses themselves are compared.
+
+      Clauses only ever lose literals, so occurrence lists and signatures built
+      up front remain valid (if conservative) filters throughout. """
+
+  # Number of clauses whose candidate pairs are generated at a time.
+  BATCH_SIZE = 1 << 14
+
+  def __init__(self, dimacs):
+    self.num_vars = dimacs.num_vars
+    self.is_unsat = bool(np.any(np.diff(dimacs.offsets) == 0))
+    self.literals, self.offsets, is_tautology = DimacsUtils.normalise(dimacs.literals, dimacs.offsets)
+    self.removed = is_tautology.tolist()
+    self.keep_literals = np.ones(len(self.literals), dtype=bool)
+    self.lengths = np.diff(self.offsets).tolist()
+    self.sets = {}
+
+    # Bit of each variable in a signature.
+    variable_bits = np.uint64(1) << (DimacsUtils.hash_literals(np.arange(self.num_vars + 1)) & np.uint64(63))
+    self.variable_bits = variable_bits.tolist()
+    self.signature_array = np.zeros(len(self.offsets) - 1, dtype=np.uint64)
+    # reduceat needs non-empty clauses, and with an empty clause there is
+    # nothing left to do anyway.
+    if len(self.literals) > 0 and not self.is_unsat:
+      self.signature_array = np.bitwise_or.reduceat(variable_bits[np.abs(self.literals)], self.offsets[:-1])
+    self.signatures = self.signature_array.tolist()
+
+    # Occurrence lists of variables (both polarities) in compact form, taken
+    # from the occurrence index of the input. Normalisation keeps the clause
+    # indices, so they apply here too.
+    occurrence_index = dimacs.occurrence_index()
+    self.occurrence_clauses = occurrence_index.get_clause_ids()
+    self.occurrence_offsets = occurrence_index.offsets[::2]
+    self.occurrence_counts = np.diff(self.occurrence_offsets)
+    self.variables = np.abs(self.literals).astype(np.int64)
+    # The variable with the fewest occurrences in each clause.
+    self.pivots = np.zeros(len(self.offsets) - 1, dtype=np.int64)
+    if len(self.literals) > 0 and not self.is_unsat:
+      keys = self.occurrence_counts[self.variables] * len(self.literals) + np.arange(len(self.literals))
+      self.pivots = self.variables[np.minimum.reduceat(keys, self.offsets[:-1]) % len(self.literals)]
+
+  def run(self):
+    """ Returns the simplified formula. An unsatisfiable formula is returned
+        as [[1], [-1]]. """
+    # First do a backward subsumption pass over all clauses, shortest first,
+    # with candidate pairs generated and filtered in bulk.
+    queue = collections.deque()
+    order = np.argsort(np.diff(self.offsets), kind='stable')
+    for start in range(0, len(order), self.BATCH_SIZE):
+      if self.is_unsat:
+        break
+      indices, others = self.__get_candidate_pairs(order[start:start + self.BATCH_SIZE])
+      for index, other in zip(indices.tolist(), others.tolist()):
+        if self.__is_candidate(index, other):
+          if self.__apply(index, other):
+            queue.append(other)
+          if self.is_unsat:
+            break
+    # Then process clauses that were strengthened until nothing changes.
+    while queue and not self.is_unsat:
+      index = queue.popleft()
+      if not self.removed[index]:
+        queue.extend(self.__backward_subsume(index))
+    if self.is_unsat:
+      return Dimacs([[1], [-1]])
+    literals, offsets = DimacsUtils.filter(self.literals, self.offsets,
+      keep_literals=self.keep_literals, keep_clauses=~np.array(self.removed, dtype=bool))
+    return Dimacs(literals=literals, offsets=offsets)
+
+  def __get_candidate_pairs(self, indices):
+    """ For each of the given clauses, list the clauses that contain its least
+        frequent variable and pass the length and signature tests. """
+    if len(self.literals) == 0 or self.is_unsat:
+      return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    pivots = self.pivots[indices]
+    num_pairs = self.occurrence_counts[pivots]
+    pair_offsets = DimacsUtils.make_offsets(num_pairs)
+    positions = np.arange(pair_offsets[-1]) - np.repeat(pair_offsets[:-1], num_pairs) + \
+      np.repeat(self.occurrence_offsets[pivots], num_pairs)
+    pair_indices = np.repeat(indices, num_pairs)
+    pair_others = self.occurrence_clauses[positions]
+    lengths = np.diff(self.offsets)
+    signatures = self.signature_array
+    keep = (pair_indices != pair_others) & (lengths[pair_others] >= lengths[pair_indices]) & \
+      ((signatures[pair_indices] & ~signatures[pair_others]) == 0)
+    return pair_indices[keep], pair_others[keep]
+
+  def __get_occurrences(self, variable):
+    return self.occurrence_clauses[self.occurrence_offsets[variable]:self.occurrence_offsets[variable + 1]].tolist()
+
+  def __get_set(self, index):
+    if index not in self.sets:
+      start, end = self.offsets[index], self.offsets[index + 1]
+      self.sets[index] = set(self.literals[start:end][self.keep_literals[start:end]].tolist())
+    return self.sets[index]
+
+  def __is_candidate(self, index, other):
+    return other != index and not self.removed[index] and not self.removed[other] and \
+      self.lengths[other] >= self.lengths[index] and \
+      not self.signatures[index] & ~self.signatures[other]
+
+  def __backward_subsume(self, index):
+    """ Remove or strengthen every clause that the given clause subsumes or
+        self-subsumes. Returns the clauses that were strengthened. """
+    strengthened = []
+    # Any clause it (self-)subsumes contains the variable with the fewest occurrences.
+    pivot = min((abs(literal) for literal in self.__get_set(index)), key=lambda variable: self.occurrence_counts[variable])
+    for other in self.__get_occurrences(pivot):
+      if self.__is_candidate(index, other):
+        if self.__apply(index, other):
+          strengthened.append(other)
+        if self.is_unsat or self.removed[index]:
+          break
+    return strengthened
+
+  def __apply(self, index, other):
+    """ Remove or strengthen a clause if the given clause (self-)subsumes it.
+        Returns True if the clause was strengthened (and is still there). """
+    result = self.__subsumes(self.__get_set(index), self.__get_set(other))
+    if result == 0:
+      self.__remove(other)
+    elif result is not None:
+      self.__strengthen(other, result)
+      return not self.is_unsat and self.__forward_subsume(other)
+    return False
+
+  def __forward_subsume(self, index):
+    """ Check whether a (strengthened) clause is subsumed by, or can be further
+        strengthened with, another clause. Returns False if it was removed. """
+    while not self.is_unsat:
+      literals = self.__get_set(index)
+      candidates = set()
+      for literal in literals:
+        candidates.update(self.__get_occurrences(abs(literal)))
+      for other in candidates:
+        if self.__is_candidate(other, index):
+          result = self.__subsumes(self.__get_set(other), literals)
+          if result == 0:
+            self.__remove(index)
+            return False
+          elif result is not None:
+            self.__strengthen(index, result)
+            break
+      else:
+        break
+    return True
+
+  @staticmethod
+  def __subsumes(literals, other_literals):
+    """ Returns 0 if literals is a subset of other_literals, the literal to
+        remove from other_literals if literals self-subsumes it and None
+        otherwise. """
+    flipped = None
+    for literal in literals:
+      if literal not in other_literals:
+        if flipped is None and -literal in other_literals:
+          flipped = -literal
+        else:
+          return None
+    return 0 if flipped is None else flipped
+
+  def __remove(self, index):
+    self.removed[index] = True
+
+  def __strengthen(self, index, literal):
+    literals = self.__get_set(index)
+    literals.discard(literal)
+    start, end = self.offsets[index], self.offsets[index + 1]
+    self.keep_literals[start + np.flatnonzero(self.literals[start:end] == literal)] = False
+    self.lengths[index] = len(literals)
+    signature = 0
+    for remaining in literals:
+      signature |= self.variable_bits[abs(remaining)]
+    self.signatures[index] = signature
+    if len(literals) == 0:
+      self.is_unsat = True
+
+def subsume(dimacs):
+  """ Remove subsumed clauses from a mxklabs.dimacs.Dimacs object and apply
+      self-subsuming resolution with a Subsumer. Returns an equivalent,
+      usually smaller, Dimacs object. """
+  return Subsumer(dimacs).run()
@@ -0,0 +1,34 @@
+""" Helpers shared by the tests in this directory. """
+
+import itertools
+import random
+
+import numpy as np
+
+def solve(clauses, num_vars):
+  """ Brute-force solver returning a boolean array indexed by variable. """
+  for values in itertools.product([False, True], repeat=num_vars):
+    assignment = np.array((False,) + values)
+    if all(any(assignment[abs(l)] == (l > 0) for l in clause) for clause in clauses):
+      return assignment
+  return None
+
+def is_model(clauses, assignment):
+  return all(any(assignment[abs(l)] == (l > 0) for l in clause) for clause in clauses)
+
+def random_cnfs(seed, count, max_vars, max_length, max_clauses):
+  """ Yield count seeded random (num_vars, clauses) pairs with 1..max_vars
+      variables, 1..max_clauses clauses and 1..max_length literals per clause.
+      The random module is used, so tests can draw more values in between. """
+  random.seed(seed)
+  for _ in range(count):
+    num_vars = random.randint(1, max_vars)
+    clauses = [[random.choice([-1, 1]) * random.randint(1, num_vars) for _ in range(random.randint(1, max_length))]
+      for _ in range(random.randint(1, max_clauses))]
+    yield num_vars, clauses
+
+def write(tmp_path, contents):
+  """ Write bytes to an input file in tmp_path and return its filename. """
+  filename = tmp_path / "input.cnf"
+  filename.write_bytes(contents)
+  return str(filename)
@@ -0,0 +1,18 @@
+import json
+
+import mxklabs.dimacs.benchmarks
+
+def test_benchmarks(tmp_path):
+  output = tmp_path / "results.json"
+  results = mxklabs.dimacs.benchmarks.main(["--sizes", "200", "--repeat", "1", "--output", str(output),
+    "--directory", str(tmp_path)])
+  assert(results == json.loads(output.read_text()))
+  shapes = list(mxklabs.dimacs.benchmarks.SHAPES)
+  modes = list(mxklabs.dimacs.benchmarks.MODES)
+  assert([(s, m) for s in shapes for m in modes] == [(r["shape"], r["mode"]) for r in results["results"]])
+  for result in results["results"]:
+    assert((2 if result["shape"] == "long_clauses" else 200) == result["clauses"])
+    assert(result["mb_per_s"] > 0 and result["clauses_per_s"] > 0 and result["peak_memory_bytes"] > 0)
+  comparison = mxklabs.dimacs.benchmarks.compare(results, results)
+  assert(len(results["results"]) == len(comparison))
+  assert(all(1.0 == ratio for _, _, _, ratio in comparison))
@@ -0,0 +1,47 @@
+import os
+
+import mxklabs.dimacs
+
+def test_cache_round_trip(tmp_path):
+  filename = tmp_path / "input.cnf"
+  filename.write_text("c cached\np cnf 9 3\n1 -3 0\n2 3 -1 0\n-9 0\n")
+  cache_dir = tmp_path / "cache"
+  cold = mxklabs.dimacs.read(filename=str(filename), cache_dir=str(cache_dir))
+  assert(1 == len(os.listdir(cache_dir)))
+  warm = mxklabs.dimacs.read(filename=str(filename), cache_dir=str(cache_dir))
+  assert(cold.clauses == warm.clauses)
+  assert(9 == warm.num_vars)
+  assert(3 == warm.num_clauses)
+
+def test_cache_is_warm(tmp_path, monkeypatch):
+  filename = tmp_path / "input.cnf"
+  filename.write_text("p cnf 2 1\n1 -2 0\n")
+  mxklabs.dimacs.read(filename=str(filename), cache_dir=str(tmp_path / "cache"))
+  # A warm read must not parse the file.
+  monkeypatch.setattr(mxklabs.dimacs.dimacs, "DimacsParser", None)
+  assert([[1, -2]] == mxklabs.dimacs.read(filename=str(filename), cache_dir=str(tmp_path / "cache")).clauses)
+
+def test_cache_detects_changed_content(tmp_path):
+  filename = tmp_path / "input.cnf"
+  filename.write_text("p cnf 2 1\n1 -2 0\n")
+  stat = os.stat(filename)
+  mxklabs.dimacs.read(filename=str(filename), cache_dir=str(tmp_path / "cache"))
+  # Same size and modification time, different content.
+  filename.write_text("p cnf 2 1\n2 -1 0\n")
+  os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+  assert([[2, -1]] == mxklabs.dimacs.read(filename=str(filename), cache_dir=str(tmp_path / "cache")).clauses)
+
+def test_cache_replaces_stale_entry(tmp_path):
+  filename = tmp_path / "input.cnf"
+  cache_dir = tmp_path / "cache"
+  filename.write_text("p cnf 2 1\n1 -2 0\n")
+  mxklabs.dimacs.read(filename=str(filename), cache_dir=str(cache_dir))
+  for clause, mtime_ns in [("2 -1", 10**18), ("2 1", 2 * 10**18)]:
+    # A changed source overwrites its entry instead of adding another.
+    filename.write_text("p cnf 2 1\n%s 0\n" % clause)
+    os.utime(filename, ns=(mtime_ns, mtime_ns))
+    assert([[int(l) for l in clause.split()]] == mxklabs.dimacs.read(filename=str(filename), cache_dir=str(cache_dir)).clauses)
+    assert(1 == len(os.listdir(cache_dir)))
+  os.utime(filename, ns=(3 * 10**18, 3 * 10**18))
+  assert([[2, 1]] == mxklabs.dimacs.read(filename=str(filename), cache_dir=str(cache_dir)).clauses)
+  assert(1 == len(os.listdir(cache_dir)))
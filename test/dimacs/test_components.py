@@ -0,0 +1,36 @@
+import mxklabs.dimacs
+import numpy as np
+
+from cnfhelpers import is_model, random_cnfs, solve
+
+def test_split_components():
+  dimacs = mxklabs.dimacs.Dimacs([[5, -9], [2, 3], [-9, 12], [-3], [7]], num_vars=12)
+  components = mxklabs.dimacs.split_components(dimacs)
+  assert([[[1, 2], [-2]], [[1, -2], [-2, 3]], [[1]]] == [c.clauses for c, _ in components])
+  assert([[0, 2, 3], [0, 5, 9, 12], [0, 7]] == [m.tolist() for _, m in components])
+  assert([2, 3, 1] == [c.num_vars for c, _ in components])
+
+def test_split_components_empty_clause():
+  components = mxklabs.dimacs.split_components(mxklabs.dimacs.Dimacs([[1, 2], [], [3]]))
+  assert([[[]], [[1, 2]], [[1]]] == [c.clauses for c, _ in components])
+  assert([] == mxklabs.dimacs.split_components(mxklabs.dimacs.Dimacs([])))
+
+def test_split_components_chain():
+  # A long chain needs several hooking rounds.
+  num_vars = 1000
+  order = np.random.RandomState(0).permutation(num_vars) + 1
+  dimacs = mxklabs.dimacs.Dimacs([[int(a), -int(b)] for a, b in zip(order[:-1], order[1:])])
+  components = mxklabs.dimacs.split_components(dimacs)
+  assert(1 == len(components))
+  assert(list(range(num_vars + 1)) == components[0][1].tolist())
+
+def test_split_components_random_merge():
+  for num_vars, clauses in random_cnfs(4, 200, max_vars=8, max_length=2, max_clauses=8):
+    components = mxklabs.dimacs.split_components(mxklabs.dimacs.Dimacs(clauses, num_vars=num_vars))
+    assert(sorted(map(sorted, clauses)) == sorted(sorted(int(m[abs(l)]) * (1 if l > 0 else -1) for l in clause)
+      for c, m in components for clause in c.clauses))
+    models = [solve(c.clauses, c.num_vars) for c, _ in components]
+    if any(model is None for model in models):
+      assert(solve(clauses, num_vars) is None)
+    else:
+      assert(is_model(clauses, mxklabs.dimacs.merge_models(models, [m for _, m in components], num_vars)))
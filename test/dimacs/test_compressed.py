@@ -0,0 +1,28 @@
+import bz2
+import gzip
+import lzma
+
+import mxklabs.dimacs
+import pytest
+
+CNF = b"c compressed\np cnf 12 3\n1 -3 0\n12 3\n-1 0\n-2 0\n"
+
+@pytest.mark.parametrize("suffix, compress", [(".gz", gzip.compress), (".bz2", bz2.compress), (".xz", lzma.compress)])
+def test_read_compressed(tmp_path, suffix, compress):
+  # Detection uses magic bytes, not the file extension.
+  filename = tmp_path / ("input.cnf" + suffix)
+  filename.write_bytes(compress(CNF))
+  dimacs = mxklabs.dimacs.read(filename=str(filename))
+  assert([[1, -3], [12, 3, -1], [-2]] == dimacs.clauses)
+
+def test_read_compressed_small_chunks(tmp_path, monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.dimacs.DimacsParser, "CHUNK_SIZE", 3)
+  filename = tmp_path / "input"
+  filename.write_bytes(gzip.compress(CNF))
+  assert([[1, -3], [12, 3, -1], [-2]] == list(mxklabs.dimacs.iter_clauses(filename=str(filename))))
+
+def test_read_compressed_error_location(tmp_path):
+  filename = tmp_path / "input.cnf.xz"
+  filename.write_bytes(lzma.compress(b"p cnf 3 1\n1 -3 0\n2 y 0\n"))
+  with pytest.raises(Exception, match=r"^error: invalid syntax \(line 3, column 3\)$"):
+    mxklabs.dimacs.read(filename=str(filename))
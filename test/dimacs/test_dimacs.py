@@ -0,0 +1,141 @@
+import array
+import random
+
+import mxklabs.dimacs
+import numpy as np
+import pytest
+
+def test_read_compact_buffers():
+  dimacs = mxklabs.dimacs.read(string="p cnf 5 3\n1 -3 0\n2 3 -1 0\n-4 0\n")
+  assert(4 == dimacs.num_vars)
+  assert(3 == dimacs.num_clauses)
+  assert(np.int32 == dimacs.literals.dtype)
+  assert([1, -3, 2, 3, -1, -4] == dimacs.literals.tolist())
+  assert([0, 2, 5, 6] == dimacs.offsets.tolist())
+  assert([[1, -3], [2, 3, -1], [-4]] == dimacs.clauses)
+  assert([2, 3, -1] == dimacs.clause(1).tolist())
+
+def test_buffers_are_zero_copy_and_read_only():
+  literals = array.array('i', [1, -2, 2])
+  offsets = array.array('q', [0, 2, 3])
+  dimacs = mxklabs.dimacs.Dimacs(literals=literals, offsets=offsets)
+  assert(np.shares_memory(dimacs.literals, np.frombuffer(literals, dtype=np.int32)))
+  assert(np.shares_memory(dimacs.clause(0), dimacs.literals))
+  with pytest.raises(ValueError):
+    dimacs.literals[0] = 5
+
+def test_from_clauses():
+  dimacs = mxklabs.dimacs.Dimacs([[1, -7], [3]])
+  assert(7 == dimacs.num_vars)
+  assert(2 == dimacs.num_clauses)
+  assert([[1, -7], [3]] == dimacs.clauses)
+
+def test_empty():
+  dimacs = mxklabs.dimacs.Dimacs([])
+  assert(0 == dimacs.num_vars)
+  assert(0 == dimacs.num_clauses)
+  assert([] == dimacs.clauses)
+
+def test_literal_out_of_range():
+  with pytest.raises(Exception, match=r"error: literal out of range \(line 2, column 3\)"):
+    mxklabs.dimacs.read(string="p cnf 3 1\n1 2147483648 0\n")
+
+def test_read_from_file_in_small_chunks(tmp_path, monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.dimacs.DimacsParser, "CHUNK_SIZE", 4)
+  filename = tmp_path / "simple.cnf"
+  filename.write_text("c comment\np cnf 12 3\n1 -3\n0 12 3 -1 0\nc another comment\n-4 0\n")
+  dimacs = mxklabs.dimacs.read(filename=str(filename))
+  assert([[1, -3], [12, 3, -1], [-4]] == dimacs.clauses)
+
+def test_error_location_after_bulk_tokenizing(tmp_path, monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.dimacs.DimacsParser, "CHUNK_SIZE", 16)
+  filename = tmp_path / "bad.cnf"
+  filename.write_text("p cnf 3 4\n1 2 0\nc 2 x\n1 2 0\n-1 3 0\n 2 3x 0\n")
+  with pytest.raises(Exception, match=r"^error: invalid syntax \(line 6, column 4\)$"):
+    mxklabs.dimacs.read(filename=str(filename))
+
+def test_multi_digit_last_token():
+  dimacs = mxklabs.dimacs.read(string="p cnf 12 1\n1 -12")
+  assert([[1, -12]] == dimacs.clauses)
+
+def test_stats():
+  dimacs = mxklabs.dimacs.Dimacs([[1, -3], [2, 3, -1], [-4], [1, 2], [3]])
+  stats = dimacs.stats()
+  assert([0, 2, 2, 1] == stats.clause_length_histogram.tolist())
+  assert([0, 2, 2, 2, 0] == stats.positive_occurrences.tolist())
+  assert([0, 1, 0, 1, 1] == stats.negative_occurrences.tolist())
+  assert(2 == stats.num_unit_clauses)
+  assert(2 == stats.num_binary_clauses)
+
+def test_stats_empty():
+  stats = mxklabs.dimacs.Dimacs([]).stats()
+  assert([] == stats.clause_length_histogram.tolist())
+  assert(0 == stats.num_unit_clauses)
+  assert([0] == stats.positive_occurrences.tolist())
+
+def test_occurrence_index():
+  dimacs = mxklabs.dimacs.Dimacs([[1, -2], [2, 3], [-1, -2, 3], [1]])
+  index = dimacs.occurrence_index()
+  assert(index is dimacs.occurrence_index())
+  assert([0, 3] == index.get_clauses(1).tolist())
+  assert([2] == index.get_clauses(-1).tolist())
+  assert([1, 0, 2] == index.get_variable_clauses(2).tolist())
+  assert([] == index.get_clauses(-3).tolist())
+  assert([0, 2, 1, 2] == index.get_positive_counts().tolist())
+  # Lookups are views into the index.
+  assert(not index.get_clauses(1).flags.writeable)
+  assert(index.get_clauses(1).base is not None)
+
+def test_compact():
+  dimacs = mxklabs.dimacs.Dimacs([[7, -3], [3, 1000], [-1000, -7]], num_vars=5000)
+  compact, forward_map, inverse_map = dimacs.compact()
+  assert([[2, -1], [1, 3], [-3, -2]] == compact.clauses)
+  assert(3 == compact.num_vars)
+  assert([0, 3, 7, 1000] == inverse_map.tolist())
+  assert(2 == forward_map[7] and 0 == forward_map[8])
+  # Translate a model of the compact formula back to the original variables.
+  model = np.array([False, True, False, True])
+  original = model[forward_map]
+  assert(original[3] and not original[7] and original[1000] and not original[4])
+
+def test_check_model():
+  dimacs = mxklabs.dimacs.Dimacs([[1, -2], [2, 3], [], [-1, -3]])
+  assert([False, False, True, True] == dimacs.check_model(np.array([False, True, True, True])).tolist())
+  assert([True, False, True, False] == dimacs.check_model([-1, 2, 3]).tolist())
+
+def test_check_model_batch():
+  clauses = [[1, -2], [2, 3, -4], [-1, -3], [4]]
+  dimacs = mxklabs.dimacs.Dimacs(clauses)
+  models = np.random.RandomState(0).rand(50, 5) < 0.5
+  expected = [[not any(model[abs(l)] == (l > 0) for l in clause) for clause in clauses] for model in models]
+  assert(expected == dimacs.check_model(models).tolist())
+  # Rows are split across several passes when the buffer is small.
+  dimacs.CHECK_BUFFER_SIZE = 16
+  assert(expected == dimacs.check_model(models).tolist())
+
+def test_fingerprint():
+  random.seed(6)
+  clauses = [[random.choice([-1, 1]) * random.randint(1, 50) for _ in range(random.randint(1, 5))] for _ in range(300)]
+  fingerprint = mxklabs.dimacs.Dimacs(clauses).fingerprint()
+  assert(64 == len(fingerprint))
+  shuffled = [random.sample(clause, len(clause)) for clause in clauses]
+  random.shuffle(shuffled)
+  assert(fingerprint == mxklabs.dimacs.Dimacs(shuffled).fingerprint())
+  text = "c a comment\np cnf %d %d\n%s" % (max(abs(l) for c in clauses for l in c), len(clauses),
+    "".join("%s 0\nc another comment\n" % " ".join(map(str, clause)) for clause in shuffled))
+  assert(fingerprint == mxklabs.dimacs.read(string=text).fingerprint())
+  assert(fingerprint != mxklabs.dimacs.Dimacs(clauses[:-1]).fingerprint())
+  assert(fingerprint != mxklabs.dimacs.Dimacs(clauses + [clauses[0]]).fingerprint())
+  assert(fingerprint != mxklabs.dimacs.Dimacs(clauses[:-1] + [[-l for l in clauses[-1]]]).fingerprint())
+  assert(fingerprint != mxklabs.dimacs.Dimacs(clauses, num_vars=51).fingerprint())
+  assert(mxklabs.dimacs.Dimacs([]).fingerprint() != mxklabs.dimacs.Dimacs([[]]).fingerprint())
+
+def test_fingerprint_wcnf_qdimacs():
+  wcnf = mxklabs.dimacs.Wcnf([[1, -2], [2], [3]], weights=[3, 5, 9], top=9)
+  assert(wcnf.fingerprint() == mxklabs.dimacs.Wcnf([[3], [-2, 1], [2]], weights=[10, 3, 5], top=10).fingerprint())
+  assert(wcnf.fingerprint() != mxklabs.dimacs.Wcnf([[1, -2], [2], [3]], weights=[5, 3, 9], top=9).fingerprint())
+  assert(wcnf.fingerprint() != mxklabs.dimacs.Dimacs(wcnf.clauses).fingerprint())
+  qdimacs = mxklabs.dimacs.Qdimacs([[1, -2], [2, 3]], quantifiers=[('a', [1, 2]), ('e', [3])])
+  assert(qdimacs.fingerprint() == mxklabs.dimacs.Qdimacs([[3, 2], [-2, 1]], quantifiers=[('a', [2, 1]), ('e', [3])]).fingerprint())
+  assert(qdimacs.fingerprint() != mxklabs.dimacs.Qdimacs([[1, -2], [2, 3]], quantifiers=[('e', [3]), ('a', [1, 2])]).fingerprint())
+  assert(qdimacs.fingerprint() != mxklabs.dimacs.Qdimacs([[1, -2], [2, 3]], quantifiers=[('a', [1]), ('e', [2, 3])]).fingerprint())
@@ -0,0 +1,41 @@
+import random
+
+import mxklabs.dimacs
+import numpy as np
+
+from cnfhelpers import is_model, random_cnfs, solve
+
+def test_eliminate_tseitin_and():
+  # 3 <-> (1 & 2), 4 <-> (3 | 5), with 4 asserted.
+  clauses = [[-3, 1], [-3, 2], [3, -1, -2], [-4, 3, 5], [4, -3], [4, -5], [4]]
+  reduced, reconstructor = mxklabs.dimacs.eliminate_variables(mxklabs.dimacs.Dimacs(clauses))
+  assert(reduced.num_clauses < len(clauses))
+  model = reconstructor.extend(solve(reduced.clauses, 5))
+  assert(is_model(clauses, model))
+
+def test_eliminate_tautological_resolvents():
+  # Every resolvent on 1 is a tautology, so eliminating 1 removes everything.
+  clauses = [[1, 2, 3], [1, -2, -3], [-1, 2, -3], [-1, -2, 3]]
+  reduced, reconstructor = mxklabs.dimacs.eliminate_variables(mxklabs.dimacs.Dimacs(clauses))
+  assert([] == reduced.clauses)
+  assert(is_model(clauses, reconstructor.extend(np.zeros(4, dtype=bool))))
+
+def test_eliminate_max_steps():
+  clauses = [[1, 2], [-1, 3], [-2, -3]]
+  reduced, _ = mxklabs.dimacs.eliminate_variables(mxklabs.dimacs.Dimacs(clauses), max_steps=0)
+  assert(clauses == reduced.clauses)
+
+def test_eliminate_unsat():
+  reduced, _ = mxklabs.dimacs.eliminate_variables(mxklabs.dimacs.Dimacs([[1, 2], [1, -2], [-1, 2], [-1, -2]]))
+  assert([[1], [-1]] == reduced.clauses)
+
+def test_eliminate_random():
+  for num_vars, clauses in random_cnfs(3, 300, max_vars=7, max_length=4, max_clauses=12):
+    bound = random.randint(0, 2)
+    reduced, reconstructor = mxklabs.dimacs.eliminate_variables(mxklabs.dimacs.Dimacs(clauses), bound=bound)
+    if bound == 0:
+      assert(reduced.num_clauses <= len(clauses))
+    model = solve(reduced.clauses, num_vars)
+    assert((model is None) == (solve(clauses, num_vars) is None))
+    if model is not None:
+      assert(is_model(clauses, reconstructor.extend(model)))
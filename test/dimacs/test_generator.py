@@ -0,0 +1,53 @@
+import io
+
+import mxklabs.dimacs
+import numpy as np
+import pytest
+
+def test_iter_random_ksat():
+  blocks = list(mxklabs.dimacs.iter_random_ksat(20, num_clauses=1000, k=4, seed=3, block_size=300))
+  assert([300, 300, 300, 100] == [len(offsets) - 1 for _, offsets in blocks])
+  for literals, offsets in blocks:
+    assert(np.array_equal(np.arange(0, len(literals) + 1, 4), offsets))
+    variables = np.sort(np.abs(literals).reshape(-1, 4), axis=1)
+    assert(np.all(variables[:, 1:] != variables[:, :-1]))
+    assert(1 <= variables.min() and variables.max() <= 20)
+  literals = np.concatenate([literals for literals, _ in blocks])
+  assert(0.45 < np.mean(literals < 0) < 0.55)
+
+def test_iter_random_ksat_all_variables():
+  # Every clause has to use every variable (in some order).
+  for k in [1, 2, 16, 40]:
+    literals, offsets = next(mxklabs.dimacs.iter_random_ksat(k, num_clauses=200, k=k, seed=k))
+    assert(200 * k == len(literals))
+    assert(np.all(np.sort(np.abs(literals).reshape(-1, k), axis=1) == np.arange(1, k + 1)))
+
+def test_iter_random_ksat_dense(monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.generator, "KEY_BUFFER_SIZE", 100)
+  literals, _ = next(mxklabs.dimacs.iter_random_ksat(30, num_clauses=2000, k=10, seed=2))
+  variables = np.sort(np.abs(literals).reshape(-1, 10), axis=1)
+  assert(np.all(variables[:, 1:] != variables[:, :-1]))
+  counts = np.bincount(variables.reshape(-1), minlength=31)[1:]
+  assert(np.all(np.abs(counts - 2000 * 10 / 30) < 100))
+
+def test_iter_random_ksat_seed():
+  first = list(mxklabs.dimacs.iter_random_ksat(100, num_clauses=50, seed=1))
+  second = list(mxklabs.dimacs.iter_random_ksat(100, num_clauses=50, seed=1))
+  third = list(mxklabs.dimacs.iter_random_ksat(100, num_clauses=50, seed=2))
+  assert(np.array_equal(first[0][0], second[0][0]))
+  assert(not np.array_equal(first[0][0], third[0][0]))
+
+def test_iter_random_ksat_errors():
+  with pytest.raises(Exception, match=r"^error: cannot pick 3 distinct variables out of 2$"):
+    list(mxklabs.dimacs.iter_random_ksat(2, num_clauses=1))
+
+def test_write_random_ksat(monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.generator, "CLAUSE_BLOCK_SIZE", 64)
+  file = io.BytesIO()
+  assert(426 == mxklabs.dimacs.write_random_ksat(file, 100, seed=5, comments=["random"]))
+  assert(file.getvalue().startswith(b"c random\np cnf 100 426\n"))
+  dimacs = mxklabs.dimacs.read(string=file.getvalue().decode())
+  literals = np.concatenate([literals for literals, _ in mxklabs.dimacs.iter_random_ksat(100, seed=5, block_size=64)])
+  assert(np.array_equal(literals, dimacs.literals))
+  assert(426 == dimacs.num_clauses)
+  assert(7 == len(list(mxklabs.dimacs.iter_random_ksat(100, seed=5))))
@@ -0,0 +1,64 @@
+import io
+import time
+
+import mxklabs.dimacs
+import numpy as np
+import pytest
+
+ICNF = "c incremental\np inccnf\n1 2 0\n-1 3 0\na -3 0\n-2 0\na 0\na 1 -3 0\n3 4 0\n"
+
+def queries(**kwargs):
+  return [(dimacs.clauses, None if assumptions is None else assumptions.tolist())
+    for dimacs, assumptions in mxklabs.dimacs.iter_icnf(**kwargs)]
+
+def test_iter_icnf():
+  assert([([[1, 2], [-1, 3]], [-3]), ([[-2]], []), ([], [1, -3]), ([[3, 4]], None)] == queries(string=ICNF))
+
+def test_iter_icnf_modes(tmp_path):
+  rng = np.random.RandomState(5)
+  lines = ["p inccnf\n"]
+  for _ in range(200):
+    for _ in range(rng.randint(0, 30)):
+      lines.append("%s 0\n" % " ".join(map(str, rng.randint(1, 40, size=3) * rng.choice([-1, 1], size=3))))
+    lines.append("a %s 0\n" % " ".join(map(str, rng.randint(1, 40, size=rng.randint(0, 4)))))
+  text = "".join(lines)
+  path = tmp_path / "queries.icnf"
+  path.write_text(text)
+  expected = queries(string=text)
+  assert(200 == len(expected))
+  assert(expected == queries(filename=str(path)))
+  assert(expected == queries(filename=str(path), use_mmap=True))
+  assert(expected == queries(file=io.StringIO(text)))
+
+def test_iter_icnf_throughput(tmp_path):
+  # Clause and assumption lines alternate, so every query is small.
+  num_queries = 50000
+  text = "p inccnf\n" + "".join("%d -%d 0\na %d 0\n" % (i % 100 + 1, i % 97 + 1, i % 89 + 1) for i in range(num_queries))
+  path = tmp_path / "queries.icnf"
+  path.write_text(text)
+  for kwargs in [dict(string=text), dict(filename=str(path)), dict(filename=str(path), use_mmap=True)]:
+    start = time.monotonic()
+    result = queries(**kwargs)
+    assert(time.monotonic() - start < 3)
+    assert(num_queries == len(result))
+    assert(([[1, -1]], [1]) == result[0])
+    assert(([[100, -45]], [71]) == result[-1])
+
+def test_iter_icnf_is_lazy(monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.dimacs.DimacsParser, "CHUNK_SIZE", 8)
+  iterator = mxklabs.dimacs.iter_icnf(file=io.StringIO("p inccnf\n1 0\na 1 0\n" + "2 0\n" * 10 + "bad\n"))
+  dimacs, assumptions = next(iterator)
+  assert([[1]] == dimacs.clauses)
+  with pytest.raises(Exception, match=r"invalid syntax \(line 14, column 1\)"):
+    next(iterator)
+
+@pytest.mark.parametrize("string,message", [
+  ("p cnf 1 1\n1 0\n", r"invalid syntax \(line 1, column 3\)"),
+  ("p inccnf 1\n", r"invalid syntax \(line 1, column 10\)"),
+  ("p inccnf\n1 2\na 1 0\n", r"clause not terminated by '0' \(line 3, column 1\)"),
+  ("p inccnf\n1 0\na 1\n", r"assumption list not terminated by '0' \(line 3, column 4\)"),
+  ("p inccnf\n1 0\na 1 x 0\n", r"invalid syntax \(line 3, column 5\)"),
+])
+def test_iter_icnf_errors(string, message):
+  with pytest.raises(Exception, match=message):
+    queries(string=string)
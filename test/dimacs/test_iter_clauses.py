@@ -0,0 +1,28 @@
+import mxklabs.dimacs
+import pytest
+
+def test_iter_clauses_yields_in_order():
+  string = "c comment\np cnf 3 3\n1 -3 0\n2 3\n-1 0 -2 0\n"
+  clauses = mxklabs.dimacs.iter_clauses(string=string)
+  assert([1, -3] == next(clauses))
+  assert([2, 3, -1] == next(clauses))
+  assert([-2] == next(clauses))
+  with pytest.raises(StopIteration):
+    next(clauses)
+
+def test_iter_clauses_unterminated_last_clause():
+  string = "p cnf 2 2\n1 0\n-1 2"
+  assert([[1], [-1, 2]] == list(mxklabs.dimacs.iter_clauses(string=string)))
+
+def test_iter_clauses_checks_counts_at_end():
+  string = "p cnf 3 3\n1 -3 0\n2 3 -1 0\n"
+  clauses = mxklabs.dimacs.iter_clauses(string=string)
+  assert([1, -3] == next(clauses))
+  assert([2, 3, -1] == next(clauses))
+  with pytest.raises(Exception, match=r"the declared number of clauses \(3\) does not match the actual number of clauses \(2\)"):
+    next(clauses)
+
+def test_iter_clauses_from_file(tmp_path):
+  filename = tmp_path / "simple.cnf"
+  filename.write_text("p cnf 3 2\n1 -3 0\n2 3 -1 0\n")
+  assert([[1, -3], [2, 3, -1]] == list(mxklabs.dimacs.iter_clauses(filename=str(filename))))
@@ -0,0 +1,28 @@
+import mxklabs.dimacs
+import pytest
+
+from cnfhelpers import write
+
+def test_mmap_matches_text_mode(tmp_path):
+  filename = write(tmp_path, b"c header\r\np cnf 20 4\r\n1 -3 0\r\nc 1 2 x\r\n20 3\n -1 0 -2 0\n\n5 -20")
+  text_dimacs = mxklabs.dimacs.read(filename=filename)
+  mmap_dimacs = mxklabs.dimacs.read(filename=filename, use_mmap=True)
+  assert([[1, -3], [20, 3, -1], [-2], [5, -20]] == mmap_dimacs.clauses)
+  assert(text_dimacs.literals.tolist() == mmap_dimacs.literals.tolist())
+  assert(text_dimacs.offsets.tolist() == mmap_dimacs.offsets.tolist())
+
+def test_mmap_small_chunks(tmp_path, monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.dimacs.DimacsParser, "CHUNK_SIZE", 5)
+  filename = write(tmp_path, b"p cnf 3 3\n1 -3 0\n2 3 -1 0\n-2 0\n")
+  assert([[1, -3], [2, 3, -1], [-2]] == list(mxklabs.dimacs.iter_clauses(filename=filename, use_mmap=True)))
+
+@pytest.mark.parametrize("line, column", [("1 x 0", 3), ("1 -- 0", 3), ("1 2- 0", 3), ("1 - 0", 3), ("3 2147483648 0", 3)])
+def test_mmap_error_location(tmp_path, line, column):
+  filename = write(tmp_path, ("p cnf 3 2\n1 2 0\n%s\n" % line).encode())
+  with pytest.raises(Exception, match=r"\(line 3, column %d\)$" % column):
+    mxklabs.dimacs.read(filename=filename, use_mmap=True)
+
+def test_mmap_empty_file(tmp_path):
+  filename = write(tmp_path, b"")
+  with pytest.raises(Exception, match=r"^error: missing problem statement$"):
+    mxklabs.dimacs.read(filename=filename, use_mmap=True)
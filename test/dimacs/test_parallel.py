@@ -0,0 +1,35 @@
+import mxklabs.dimacs
+import pytest
+
+from cnfhelpers import write
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_matches_sequential(tmp_path, monkeypatch, workers):
+  monkeypatch.setattr(mxklabs.dimacs.dimacs.DimacsParser, "CHUNK_SIZE", 8)
+  lines = ["c parallel", "p cnf 40 60"]
+  for i in range(1, 41):
+    lines.append("%d -%d 0" % (i, (i % 40) + 1))
+    if i % 7 == 0:
+      lines.append("c comment %d 0" % i)
+  # Clauses spanning lines and empty clauses around chunk boundaries.
+  lines += ["1 2", "3 0 0", "0 4"] + ["-%d 0" % i for i in range(1, 19)] + ["5"]
+  filename = write(tmp_path, ("\n".join(lines) + "\n").encode())
+  sequential = mxklabs.dimacs.read(filename=filename)
+  parallel = mxklabs.dimacs.read(filename=filename, workers=workers)
+  assert(60 == parallel.num_clauses)
+  assert(sequential.literals.tolist() == parallel.literals.tolist())
+  assert(sequential.offsets.tolist() == parallel.offsets.tolist())
+
+def test_parallel_error_location(tmp_path):
+  lines = ["p cnf 3 30"] + ["1 -2 0"] * 20 + ["2 3 z 0"] + ["3 0"] * 9
+  filename = write(tmp_path, ("\n".join(lines) + "\n").encode())
+  with pytest.raises(Exception, match=r"^error: invalid syntax \(line 22, column 5\)$"):
+    mxklabs.dimacs.read(filename=filename, workers=2)
+
+def test_parallel_checks_declared_sizes(tmp_path):
+  filename = write(tmp_path, b"p cnf 2 3\n1 -2 0\n2 0\n")
+  with pytest.raises(Exception, match=r"the declared number of clauses \(3\) does not match the actual number of clauses \(2\) \(line 1, column 9\)"):
+    mxklabs.dimacs.read(filename=filename, workers=2)
+  filename = write(tmp_path, b"p cnf 1 2\n1 -2 0\n2 0\n")
+  with pytest.raises(Exception, match=r"the declared number of variables \(1\) is smaller than the actual number of variables \(2\)"):
+    mxklabs.dimacs.read(filename=filename, workers=2)
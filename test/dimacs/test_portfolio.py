@@ -0,0 +1,69 @@
+import os
+import random
+import time
+
+import mxklabs.dimacs
+import pytest
+
+# The unpatched worker function.
+from mxklabs.dimacs.portfolio import _run_solver as run_solver
+
+def random_3sat(num_vars, num_clauses, seed):
+  rng = random.Random(seed)
+  return [[rng.choice([-1, 1]) * v for v in rng.sample(range(1, num_vars + 1), 3)] for _ in range(num_clauses)]
+
+def pigeonhole(num_holes):
+  """ num_holes+1 pigeons in num_holes holes (unsatisfiable). """
+  var = lambda p, h: p * num_holes + h + 1
+  clauses = [[var(p, h) for h in range(num_holes)] for p in range(num_holes + 1)]
+  for h in range(num_holes):
+    for p in range(num_holes + 1):
+      for q in range(p + 1, num_holes + 1):
+        clauses.append([-var(p, h), -var(q, h)])
+  return clauses
+
+def test_solve_portfolio_sat():
+  dimacs = mxklabs.dimacs.Dimacs(random_3sat(50, 150, 1))
+  result = mxklabs.dimacs.solve_portfolio(dimacs, solvers=['glucose4', 'cadical153'])
+  assert(result)
+  assert(result.result is True)
+  assert(result.solver in ['glucose4', 'cadical153'])
+  assert(dimacs.num_vars + 1 == len(result.model))
+  assert(not dimacs.check_model(result.model).any())
+
+def test_solve_portfolio_unsat():
+  result = mxklabs.dimacs.solve_portfolio(mxklabs.dimacs.Dimacs(pigeonhole(4)))
+  assert(not result)
+  assert(result.result is False)
+  assert(result.model is None)
+
+def test_solve_portfolio_solver_error():
+  dimacs = mxklabs.dimacs.Dimacs([[1, -2], [2]])
+  result = mxklabs.dimacs.solve_portfolio(dimacs, solvers=['nosuchsolver', 'minisat22'])
+  assert('minisat22' == result.solver)
+  assert([False, True, True] == result.model.tolist())
+  with pytest.raises(Exception, match="error: all solvers failed \\(nosuchsolver: "):
+    mxklabs.dimacs.solve_portfolio(dimacs, solvers=['nosuchsolver'])
+
+def test_solve_portfolio_timeout():
+  start = time.monotonic()
+  result = mxklabs.dimacs.solve_portfolio(mxklabs.dimacs.Dimacs(pigeonhole(12)), solvers=['minisat22'], timeout=0.5)
+  assert(result.result is None)
+  assert(result.solver is None)
+  assert(time.monotonic() - start < 10)
+
+def crash_minisat(index, solver_name, *args):
+  """ A worker that dies without a result for minisat22. It is defined at
+      module level so that it can be pickled for any start method. """
+  if solver_name == 'minisat22':
+    os._exit(3)
+  run_solver(index, solver_name, *args)
+
+def test_solve_portfolio_crashed_solver(monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.portfolio, "_run_solver", crash_minisat)
+  dimacs = mxklabs.dimacs.Dimacs([[1, -2], [2]])
+  result = mxklabs.dimacs.solve_portfolio(dimacs, solvers=['minisat22', 'glucose4'])
+  assert('glucose4' == result.solver)
+  assert([False, True, True] == result.model.tolist())
+  with pytest.raises(Exception, match=r"^error: all solvers failed \(.*minisat22: exited with code 3 without a result"):
+    mxklabs.dimacs.solve_portfolio(dimacs, solvers=['minisat22', 'nosuchsolver'])
@@ -0,0 +1,34 @@
+import mxklabs.dimacs
+
+from cnfhelpers import is_model, random_cnfs, solve
+
+def test_preprocess_example():
+  dimacs = mxklabs.dimacs.Dimacs([[1], [-1, 2], [3, 4, -3], [5, 5, -6], [-6, 5], [4, 6, 7], [-4, -7, 6], [7, -4, 6]])
+  reduced, reconstructor = mxklabs.dimacs.preprocess(dimacs)
+  # 1 and 2 are propagated, the tautology goes, 5 is pure and so on.
+  assert(reduced.num_clauses < dimacs.num_clauses)
+  model = reconstructor.extend(solve(reduced.clauses, reduced.num_vars))
+  assert(is_model(dimacs.clauses, model))
+
+def test_preprocess_unsat():
+  dimacs = mxklabs.dimacs.Dimacs([[1, 2], [-1], [-2, 3], [-3]])
+  reduced, _ = mxklabs.dimacs.preprocess(dimacs)
+  assert([[1], [-1]] == reduced.clauses)
+
+def test_preprocess_duplicates():
+  dimacs = mxklabs.dimacs.Dimacs([[1, 2, 3], [3, 2, 1, 1], [-1, -2], [-2, -1], [-3, 1], [2, -3]])
+  reduced, _ = mxklabs.dimacs.preprocess(dimacs)
+  assert([[1, 2, 3], [-1, -2], [1, -3], [2, -3]] == reduced.clauses)
+
+def test_preprocess_random():
+  for _, clauses in random_cnfs(1, 300, max_vars=7, max_length=4, max_clauses=14):
+    dimacs = mxklabs.dimacs.Dimacs(clauses)
+    reduced, reconstructor = mxklabs.dimacs.preprocess(dimacs)
+    original_model = solve(clauses, dimacs.num_vars)
+    reduced_model = solve(reduced.clauses, reduced.num_vars)
+    assert((original_model is None) == (reduced_model is None))
+    if reduced_model is not None:
+      assert(is_model(clauses, reconstructor.extend(reduced_model)))
+      # Models given as lists of signed literals work too.
+      literals = [v if reduced_model[v] else -v for v in range(1, reduced.num_vars + 1)]
+      assert(is_model(clauses, reconstructor.extend(literals)))
@@ -0,0 +1,62 @@
+import mxklabs.dimacs
+import numpy as np
+import pytest
+
+QDIMACS = "c a QBF\np cnf 4 3\na 1 2 0\ne 3 0\nc comment in the prefix\na 4 0\n1 -3 0\n-2 3 4 0\n-1 -4 0\n"
+
+def test_read_qdimacs():
+  qdimacs = mxklabs.dimacs.read_qdimacs(string=QDIMACS)
+  assert([[1, -3], [-2, 3, 4], [-1, -4]] == qdimacs.clauses)
+  assert([('a', [1, 2]), ('e', [3]), ('a', [4])] == qdimacs.quantifiers)
+  assert([b'a', b'e', b'a'] == qdimacs.quantifier_types.tolist())
+  assert([1, 2, 3, 4] == qdimacs.quantifier_variables.tolist())
+  assert([0, 2, 3, 4] == qdimacs.quantifier_offsets.tolist())
+
+def test_read_qdimacs_modes(tmp_path):
+  lines = ["p cnf 300 3000\n", "e %s 0\n" % " ".join(map(str, range(1, 101))),
+    "a %s 0\n" % " ".join(map(str, range(101, 201))), "e %s 0\n" % " ".join(map(str, range(201, 301)))]
+  rng = np.random.RandomState(3)
+  lines += ["%s 0\n" % " ".join(map(str, rng.randint(1, 301, size=3) * rng.choice([-1, 1], size=3))) for _ in range(3000)]
+  path = tmp_path / "instance.qdimacs"
+  path.write_text("".join(lines))
+  expected = mxklabs.dimacs.read_qdimacs(string="".join(lines))
+  cache_dir = str(tmp_path / "cache")
+  for qdimacs in [mxklabs.dimacs.read_qdimacs(filename=str(path)),
+                  mxklabs.dimacs.read_qdimacs(filename=str(path), use_mmap=True),
+                  mxklabs.dimacs.read_qdimacs(filename=str(path), workers=2),
+                  mxklabs.dimacs.read_qdimacs(filename=str(path), cache_dir=cache_dir),
+                  mxklabs.dimacs.read_qdimacs(filename=str(path), cache_dir=cache_dir)]:
+    assert(expected.clauses == qdimacs.clauses)
+    assert(expected.quantifiers == qdimacs.quantifiers)
+
+def test_read_qdimacs_cache_is_separate(tmp_path, monkeypatch):
+  path = tmp_path / "instance.cnf"
+  path.write_text("p cnf 2 1\n1 -2 0\n")
+  cache_dir = tmp_path / "cache"
+  mxklabs.dimacs.read(filename=str(path), cache_dir=str(cache_dir))
+  qdimacs = mxklabs.dimacs.read_qdimacs(filename=str(path), cache_dir=str(cache_dir))
+  assert([] == qdimacs.quantifiers)
+  assert(2 == len(list(cache_dir.iterdir())))
+  # Both entries survive, so reads either way are served from the cache.
+  monkeypatch.setattr(mxklabs.dimacs.dimacs, "DimacsParser", None)
+  for _ in range(2):
+    assert([[1, -2]] == mxklabs.dimacs.read(filename=str(path), cache_dir=str(cache_dir)).clauses)
+    assert([[1, -2]] == mxklabs.dimacs.read_qdimacs(filename=str(path), cache_dir=str(cache_dir)).clauses)
+
+@pytest.mark.parametrize("string,message", [
+  ("p cnf 2 1\na 1 2\n1 2 0\n", r"quantifier block not terminated by '0' \(line 2, column 6\)"),
+  ("p cnf 2 1\ne 1 x 0\n1 2 0\n", r"invalid syntax \(line 2, column 5\)"),
+  ("p cnf 2 1\ne 1 -2 0\n1 2 0\n", r"variable out of range \(line 2, column 5\)"),
+  ("p cnf 2 1\ne 1 0 2 0\n1 2 0\n", r"unexpected token after the end of the quantifier block \(line 2, column 7\)"),
+  ("p cnf 2 1\ne 1 3 0\n1 2 0\n", r"declared number of variables \(2\) is smaller than the actual number of variables \(3\)"),
+  ("p cnf 2 1\ne 1 2 0\na 1 0\n1 2 0\n", r"variable 1 is quantified more than once"),
+  ("p cnf 2 1\ne 1 0\n1 2 0\na 2 0\n", r"invalid syntax \(line 4, column 1\)"),
+  ("a 1 0\np cnf 2 1\n1 2 0\n", r"expected a problem statement or comment on this line \(line 1, column 1\)"),
+])
+def test_read_qdimacs_errors(string, message):
+  with pytest.raises(Exception, match=message):
+    mxklabs.dimacs.read_qdimacs(string=string)
+
+def test_read_rejects_quantifiers():
+  with pytest.raises(Exception, match=r"invalid syntax \(line 2, column 1\)"):
+    mxklabs.dimacs.read(string=QDIMACS.replace("c a QBF\n", ""))
@@ -0,0 +1,31 @@
+import gzip
+import lzma
+
+import mxklabs.dimacs
+import pytest
+
+def test_read_header_plain(tmp_path):
+  filename = tmp_path / "input.cnf"
+  # The clauses are never looked at.
+  filename.write_text("c a\nc b\np cnf 5000000 12\n1 x 0\n")
+  header = mxklabs.dimacs.read_header(filename=str(filename))
+  assert(5000000 == header.num_vars)
+  assert(12 == header.num_clauses)
+  assert(3 == header.line_no)
+
+@pytest.mark.parametrize("compress", [gzip.compress, lzma.compress])
+def test_read_header_compressed(tmp_path, compress):
+  filename = tmp_path / "input.cnf.gz"
+  filename.write_bytes(compress(b"p cnf 7 3\r\n1 2 0\n"))
+  header = mxklabs.dimacs.read_header(filename=str(filename))
+  assert((7, 3, 1) == (header.num_vars, header.num_clauses, header.line_no))
+
+def test_read_header_string():
+  header = mxklabs.dimacs.read_header(string="c x\np cnf 3 10")
+  assert((3, 10, 2) == (header.num_vars, header.num_clauses, header.line_no))
+
+def test_read_header_errors():
+  with pytest.raises(Exception, match=r"^error: missing problem statement$"):
+    mxklabs.dimacs.read_header(string="c only comments\n")
+  with pytest.raises(Exception, match=r"^error: expected a problem statement or comment on this line \(line 2, column 1\)$"):
+    mxklabs.dimacs.read_header(string="c comment\n1 2 0\np cnf 2 1\n")
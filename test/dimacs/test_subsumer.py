@@ -0,0 +1,36 @@
+import itertools
+import random
+
+import mxklabs.dimacs
+
+def models(clauses, num_vars):
+  return set(values for values in itertools.product([False, True], repeat=num_vars)
+    if all(any(values[abs(l) - 1] == (l > 0) for l in clause) for clause in clauses))
+
+def test_subsumption():
+  dimacs = mxklabs.dimacs.Dimacs([[1, 2, 3], [1, 2], [4, 5], [5, 4, 6], [1, 2]])
+  assert([[1, 2], [4, 5]] == mxklabs.dimacs.subsume(dimacs).clauses)
+
+def test_self_subsuming_resolution():
+  # [1, 2] strengthens [-1, 2, 3] to [2, 3] and [-2, 1] to [1], which then
+  # subsumes [1, 2].
+  dimacs = mxklabs.dimacs.Dimacs([[1, 2], [-1, 2, 3], [-2, 1], [4, -3]])
+  assert([[2, 3], [1], [4, -3]] == mxklabs.dimacs.subsume(dimacs).clauses)
+
+def test_unsat():
+  dimacs = mxklabs.dimacs.Dimacs([[1, 2], [1, -2], [-1, 2], [-1, -2]])
+  assert([[1], [-1]] == mxklabs.dimacs.subsume(dimacs).clauses)
+
+def test_empty_clause():
+  for clauses in [[[], [1, 2]], [[1, 2], []], [[1, 2], [], [3]], [[]]]:
+    assert([[1], [-1]] == mxklabs.dimacs.subsume(mxklabs.dimacs.Dimacs(clauses)).clauses)
+
+def test_subsume_random_preserves_models():
+  random.seed(2)
+  for _ in range(300):
+    num_vars = random.randint(1, 6)
+    clauses = [[random.choice([-1, 1]) * random.randint(1, num_vars) for _ in range(random.randint(1, 4))]
+      for _ in range(random.randint(1, 14))]
+    reduced = mxklabs.dimacs.subsume(mxklabs.dimacs.Dimacs(clauses))
+    assert(models(clauses, num_vars) == models(reduced.clauses, num_vars))
+    assert(reduced.num_clauses <= len(clauses))
@@ -0,0 +1,34 @@
+import tracemalloc
+
+import mxklabs.dimacs
+import pytest
+
+def test_validate_good_instance():
+  header = mxklabs.dimacs.validate(string="c x\np cnf 3 2\n1 -3 0\n2 3 -1 0\n")
+  assert((3, 2, 2) == (header.num_vars, header.num_clauses, header.line_no))
+
+@pytest.mark.parametrize("string, message", [
+  ("p cnf 3 7\n2 3 -1 0\n", r"the declared number of clauses \(7\) does not match the actual number of clauses \(1\) \(line 1, column 9\)"),
+  ("p cnf 3 2\n2 4 -1 0\n2 5 -8 0\n", r"the declared number of variables \(3\) is smaller than the actual number of variables \(8\) \(line 1, column 7\)"),
+  ("c comment\n2 -1 0\np cnf 1 2\n1 -2 0\n", r"expected a problem statement or comment on this line \(line 2, column 1\)"),
+  ("p cnf 3 1\n2 a -1 0\n", r"invalid syntax \(line 2, column 3\)"),
+  ("", r"missing problem statement")])
+def test_validate_errors(string, message):
+  with pytest.raises(Exception, match=message):
+    mxklabs.dimacs.validate(string=string)
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_validate_memory_is_flat(tmp_path, monkeypatch, use_mmap):
+  monkeypatch.setattr(mxklabs.dimacs.dimacs.DimacsParser, "CHUNK_SIZE", 1 << 12)
+  filename = tmp_path / "input.cnf"
+  num_clauses = 100000
+  with open(filename, "w") as file:
+    file.write("p cnf 100 %d\n" % num_clauses)
+    for i in range(num_clauses):
+      file.write("%d -%d %d 0\n" % (i % 100 + 1, (i * 7) % 100 + 1, (i * 13) % 100 + 1))
+  tracemalloc.start()
+  mxklabs.dimacs.validate(filename=str(filename), use_mmap=use_mmap)
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  # Storing the literals alone would take 1.2MB.
+  assert(peak < 300000)
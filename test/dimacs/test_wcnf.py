@@ -0,0 +1,85 @@
+import io
+
+import mxklabs.dimacs
+import numpy as np
+import pytest
+
+def test_read_wcnf_legacy():
+  string = "c weighted\np wcnf 3 4 10\n10 1 -2 0\n3 2 3 0\n1 -1 0\n10 -3 0\n"
+  wcnf = mxklabs.dimacs.read_wcnf(string=string)
+  assert([[1, -2], [2, 3], [-1], [-3]] == wcnf.clauses)
+  assert([10, 3, 1, 10] == wcnf.weights.tolist())
+  assert(10 == wcnf.top)
+  assert([True, False, False, True] == wcnf.is_hard().tolist())
+
+def test_read_wcnf_legacy_without_top():
+  wcnf = mxklabs.dimacs.read_wcnf(string="p wcnf 2 2\n4 1 2 0\n5 -1 0\n")
+  assert([4, 5] == wcnf.weights.tolist())
+  assert(10 == wcnf.top)
+  assert(not wcnf.is_hard().any())
+
+def test_read_wcnf_hard_soft():
+  string = "c new format\nh 1 -2 0\n3 2 3 0\nh -3 0\n9223372036854775000 -1 0\n"
+  wcnf = mxklabs.dimacs.read_wcnf(string=string)
+  assert([[1, -2], [2, 3], [-3], [-1]] == wcnf.clauses)
+  assert(9223372036854775004 == wcnf.top)
+  assert([True, False, True, False] == wcnf.is_hard().tolist())
+  assert(9223372036854775000 == wcnf.weights[3])
+
+def test_read_wcnf_empty_soft_clause():
+  wcnf = mxklabs.dimacs.read_wcnf(string="h 1 0\n5 0\n2 -1 0\n")
+  assert([[1], [], [-1]] == wcnf.clauses)
+  assert([8, 5, 2] == wcnf.weights.tolist())
+
+def test_read_wcnf_modes(tmp_path):
+  lines = ["c header\n", "p wcnf 50 2000 100\n"]
+  rng = np.random.RandomState(1)
+  for index in range(2000):
+    weight = 100 if index % 7 == 0 else rng.randint(1, 99)
+    literals = rng.randint(1, 51, size=rng.randint(1, 5)) * rng.choice([-1, 1], size=1)
+    lines.append("%d %s 0\n" % (weight, " ".join(map(str, literals))))
+  path = tmp_path / "instance.wcnf"
+  path.write_text("".join(lines))
+  expected = mxklabs.dimacs.read_wcnf(string="".join(lines))
+  for wcnf in [mxklabs.dimacs.read_wcnf(filename=str(path)),
+               mxklabs.dimacs.read_wcnf(filename=str(path), use_mmap=True),
+               mxklabs.dimacs.read_wcnf(file=io.StringIO("".join(lines)))]:
+    assert(expected.clauses == wcnf.clauses)
+    assert(expected.weights.tolist() == wcnf.weights.tolist())
+
+@pytest.mark.parametrize("string,message", [
+  ("p wcnf 2 1\n0 1 2 0\n", r"weight out of range \(line 2, column 1\)"),
+  ("p wcnf 2 1\n-3 1 2 0\n", r"weight out of range \(line 2, column 1\)"),
+  ("1 1 h 0\n", r"invalid syntax \(line 1, column 5\)"),
+  ("h 1 0\n2 3000000000 0\n", r"literal out of range \(line 2, column 3\)"),
+  ("99999999999999999999 1 0\n", r"weight out of range \(line 1, column 1\)"),
+  ("p wcnf 2 2 0\n", r"top weight out of range \(line 1, column 12\)"),
+  ("p wcnf 2 2\n1 1 0\n", r"declared number of clauses \(2\) does not match"),
+  ("p cnf 2 1\n1 1 0\n", r"invalid syntax \(line 1, column 3\)"),
+])
+def test_read_wcnf_errors(string, message):
+  with pytest.raises(Exception, match=message):
+    mxklabs.dimacs.read_wcnf(string=string)
+
+def test_write_wcnf():
+  wcnf = mxklabs.dimacs.Wcnf([[1, -2], [2], []], weights=[12345678901, 7, 12345678901], top=12345678901)
+  file = io.BytesIO()
+  mxklabs.dimacs.write_wcnf(wcnf, file)
+  assert(b"h 1 -2 0\n7 2 0\nh 0\n" == file.getvalue())
+  file = io.StringIO()
+  mxklabs.dimacs.write_wcnf(wcnf, file, comments=["legacy"], legacy=True)
+  assert("c legacy\np wcnf 2 3 12345678901\n12345678901 1 -2 0\n7 2 0\n12345678901 0\n" == file.getvalue())
+
+def test_write_read_wcnf_round_trip(tmp_path):
+  rng = np.random.RandomState(2)
+  clauses = [list(rng.randint(1, 30, size=rng.randint(0, 4)) * rng.choice([-1, 1])) for _ in range(500)]
+  weights = rng.randint(1, 2**40, size=500)
+  weights[::5] = 2**62
+  wcnf = mxklabs.dimacs.Wcnf(clauses, weights=weights, top=2**62)
+  for legacy in [False, True]:
+    path = str(tmp_path / ("out%d.wcnf" % legacy))
+    mxklabs.dimacs.write_wcnf(wcnf, path, legacy=legacy)
+    result = mxklabs.dimacs.read_wcnf(filename=path)
+    assert(wcnf.clauses == result.clauses)
+    assert(wcnf.is_hard().tolist() == result.is_hard().tolist())
+    assert(wcnf.weights[~wcnf.is_hard()].tolist() == result.weights[~result.is_hard()].tolist())
@@ -0,0 +1,65 @@
+import io
+import random
+
+import mxklabs.dimacs
+import pytest
+
+def test_write_round_trip(tmp_path):
+  random.seed(0)
+  clauses = [[random.choice([-1, 1]) * random.randint(1, 2**31 - 1) for _ in range(random.randint(1, 6))] for _ in range(500)]
+  dimacs = mxklabs.dimacs.Dimacs(clauses)
+  filename = tmp_path / "out.cnf"
+  mxklabs.dimacs.write(dimacs, str(filename), comments=["round trip"])
+  assert(filename.read_text().startswith("c round trip\np cnf %d 500\n" % dimacs.num_vars))
+  assert(clauses == mxklabs.dimacs.read(filename=str(filename)).clauses)
+
+def test_write_format():
+  file = io.BytesIO()
+  mxklabs.dimacs.write(mxklabs.dimacs.Dimacs([[1, -3], [10, 3, -100], [7]]), file)
+  assert(b"p cnf 100 3\n1 -3 0\n10 3 -100 0\n7 0\n" == file.getvalue())
+
+def test_writer_fills_in_header(monkeypatch):
+  monkeypatch.setattr(mxklabs.dimacs.DimacsWriter, "BUFFER_SIZE", 4)
+  file = io.BytesIO()
+  with mxklabs.dimacs.DimacsWriter(file) as writer:
+    writer.write_clauses(iter([[1, -2], [2, 3, 4], [-5]]))
+    writer.write_block([6, -1, 2], [0, 1, 3])
+  dimacs = mxklabs.dimacs.read(file=io.StringIO(file.getvalue().decode()))
+  assert([[1, -2], [2, 3, 4], [-5], [6], [-1, 2]] == dimacs.clauses)
+  assert(file.getvalue().startswith(b"p cnf 6 "))
+
+def test_writer_text_file():
+  file = io.StringIO()
+  with mxklabs.dimacs.DimacsWriter(file, num_vars=3, num_clauses=1) as writer:
+    writer.write_clause([1, 2, -3])
+  assert("p cnf 3 1\n1 2 -3 0\n" == file.getvalue())
+
+def test_writer_checks_declared_counts():
+  with pytest.raises(Exception, match=r"^error: the declared number of clauses \(2\) does not match the actual number of clauses \(1\)$"):
+    with mxklabs.dimacs.DimacsWriter(io.BytesIO(), num_vars=3, num_clauses=2) as writer:
+      writer.write_clause([1, 2, -3])
+
+def test_write_empty_clause(tmp_path, monkeypatch):
+  # An empty clause would be written as a bare '0' line, which is not read back.
+  assert([[1]] == mxklabs.dimacs.read(string="p cnf 1 1\n1 0\n0\n").clauses)
+  with pytest.raises(Exception, match=r"^error: cannot write clause 1 as it is empty \(a line holding only '0' is not read as a clause\)$"):
+    mxklabs.dimacs.write(mxklabs.dimacs.Dimacs([[1], [], [2]]), str(tmp_path / "empty.cnf"))
+  monkeypatch.setattr(mxklabs.dimacs.DimacsWriter, "BUFFER_SIZE", 2)
+  with pytest.raises(Exception, match=r"^error: cannot write clause 3 as it is empty "):
+    with mxklabs.dimacs.DimacsWriter(io.BytesIO()) as writer:
+      writer.write_clauses([[1, 2], [3], [-1]])
+      writer.write_clause([])
+  with pytest.raises(Exception, match=r"^error: cannot write clause 4 as it is empty "):
+    with mxklabs.dimacs.DimacsWriter(io.BytesIO()) as writer:
+      writer.write_clause([1])
+      writer.write_block([1, 2, 3, 4], [0, 1, 2, 3, 3, 4])
+
+def test_write_round_trip_without_empty_clauses(tmp_path):
+  random.seed(3)
+  clauses = [[random.choice([-1, 1]) * random.randint(1, 20) for _ in range(random.randint(1, 4))] for _ in range(100)]
+  for component, _ in mxklabs.dimacs.split_components(mxklabs.dimacs.Dimacs(clauses)):
+    filename = tmp_path / "component.cnf"
+    mxklabs.dimacs.write(component, str(filename))
+    dimacs = mxklabs.dimacs.read(filename=str(filename))
+    assert(component.clauses == dimacs.clauses)
+    assert(component.num_vars == dimacs.num_vars)